@@ -0,0 +1,110 @@
+from Checkers import *
+from Engine import Engine
+from MCTS import MCTS
+from OpeningBook import get_shared_book
+
+
+class RandomAgent:
+    """
+    Represents an agent that plays a uniformly random legal move.
+    """
+
+    def __init__(self):
+        self._name = "random"
+
+    def get_name(self):
+        """Retrieve the agent's name"""
+        return self._name
+
+    def choose_move(self, game, rng):
+        """Return the move to play in the game, rng being a random.Random"""
+        return rng.choice(game.legal_moves())
+
+
+class GreedyCaptureAgent:
+    """
+    Represents an agent that plays the legal move starting the capture sequence that captures the most opponent
+    pieces by the end of its turn, breaking ties at random.
+    """
+
+    def __init__(self):
+        self._name = "greedy"
+
+    def get_name(self):
+        """Retrieve the agent's name"""
+        return self._name
+
+    def choose_move(self, game, rng):
+        """Return the move to play in the game, rng being a random.Random"""
+        # A whole capture sequence counts as one move, credited to its first jump
+        capture_counts = {}
+        for path, captured in game.capture_sequences():
+            move = (path[0], path[1])
+            capture_counts[move] = max(capture_counts.get(move, 0), len(captured))
+
+        best_moves = []
+        best_capture_count = -1
+        for move in game.legal_moves():
+            capture_count = capture_counts.get(move, 0)
+            if capture_count > best_capture_count:
+                best_capture_count = capture_count
+                best_moves = [move]
+            elif capture_count == best_capture_count:
+                best_moves.append(move)
+
+        return rng.choice(best_moves)
+
+
+class EngineAgent:
+    """
+    Represents an agent that plays the best move of an alpha-beta search to a fixed depth.
+    """
+
+    def __init__(self, depth, time_ms=60000, book_path=None):
+        self._name = f"engine:{depth}"
+        self._depth = depth
+        self._time_ms = time_ms
+        # Tournaments create agents for every game, the book is only read once per process
+        self._engine = Engine(opening_book=get_shared_book(book_path) if book_path else None)
+
+    def get_name(self):
+        """Retrieve the agent's name"""
+        return self._name
+
+    def choose_move(self, game, rng):
+        """Return the move to play in the game, rng being a random.Random (unused, the search is deterministic)"""
+        return self._engine.best_move(game, self._time_ms, self._depth)
+
+
+class MCTSAgent:
+    """
+    Represents an agent that plays the most visited move of a Monte Carlo tree search with a fixed number of
+    playouts, searching in the calling process.
+    """
+
+    def __init__(self, playouts):
+        self._name = f"mcts:{playouts}"
+        self._playouts = playouts
+
+    def get_name(self):
+        """Retrieve the agent's name"""
+        return self._name
+
+    def choose_move(self, game, rng):
+        """Return the move to play in the game, rng being a random.Random seeding the search"""
+        return MCTS(seed=rng.getrandbits(64)).best_move(game, playouts=self._playouts)
+
+
+def create_agent(spec, book_path=None):
+    """Create an agent from its name: "random", "greedy", "engine:<depth>" or "mcts:<playouts>", engines playing
+    from the opening book file book_path if one is given"""
+    name, _, argument = spec.partition(":")
+    if name == "random":
+        return RandomAgent()
+    if name == "greedy":
+        return GreedyCaptureAgent()
+    if name == "engine":
+        return EngineAgent(int(argument or 4), book_path=book_path)
+    if name == "mcts":
+        return MCTSAgent(int(argument or 1000))
+    raise ValueError(f"Unknown agent: {spec}")
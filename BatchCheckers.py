@@ -0,0 +1,247 @@
+import numpy as np
+from Checkers import *
+
+# Board cell values: 0 for an empty square, otherwise the Checkers piece class plus one
+EMPTY = 0
+PIECE_COLOR = np.array([-1, 0, 0, 0, 1, 1, 1], dtype=np.int8)
+PIECE_RANK = np.array([-1, 0, 1, 2, 0, 1, 2], dtype=np.int8)
+MAN, KING, TRIPLE_KING = range(3)
+
+# Index of an extra board column that always stays empty, used to pad the squares in between a move
+PAD_SQUARE = 32
+
+
+def _build_move_slots():
+    """Enumerate every (starting square, destination square) pair sharing a diagonal as a fixed move slot"""
+    starts, destinations, directions, distances, between = [], [], [], [], []
+    for start_square in range(32):
+        for direction, ray in enumerate(DIAGONAL_RAYS[start_square]):
+            for distance, destination_square in enumerate(ray, 1):
+                starts.append(start_square)
+                destinations.append(destination_square)
+                directions.append(direction)
+                distances.append(distance)
+                between.append(list(ray[:distance - 1]) + [PAD_SQUARE] * (7 - distance))
+    return (np.array(starts, dtype=np.intp), np.array(destinations, dtype=np.intp),
+            np.array(directions, dtype=np.int8), np.array(distances, dtype=np.int8),
+            np.array(between, dtype=np.intp))
+
+
+MOVE_STARTS, MOVE_DESTINATIONS, MOVE_DIRECTIONS, MOVE_DISTANCES, MOVE_BETWEEN = _build_move_slots()
+MOVE_COUNT = len(MOVE_STARTS)
+MOVE_BETWEEN_MASKS = np.array([sum(1 << int(square) for square in between if square != PAD_SQUARE)
+                               for between in MOVE_BETWEEN], dtype=np.uint32)
+MOVE_IS_UP = MOVE_DIRECTIONS < DOWN_LEFT
+MOVE_IS_STEP = MOVE_DISTANCES == 1
+MOVE_SLOT_COORDS = [(SQUARE_COORD[start_square], SQUARE_COORD[destination_square])
+                    for start_square, destination_square in zip(MOVE_STARTS.tolist(), MOVE_DESTINATIONS.tolist())]
+MOVE_SLOTS = {move: slot for slot, move in enumerate(MOVE_SLOT_COORDS)}
+ALL_MOVE_SLOTS = np.arange(MOVE_COUNT)[None, :]
+
+# Jump slots starting on each square, padded by repeating the first one
+_jump_slots = [np.flatnonzero((MOVE_STARTS == square) & ~MOVE_IS_STEP) for square in range(32)]
+SQUARE_JUMP_SLOTS = np.array([np.resize(slots, max(len(slots) for slots in _jump_slots)) for slots in _jump_slots])
+
+# Cell value after a piece lands on a square: regular pieces reaching the far row become kings, kings
+# reaching their own starting row become triple kings
+PROMOTED = np.tile(np.arange(7, dtype=np.int8)[:, None], (1, 32))
+PROMOTED[BLACK_MAN + 1, 0:4] = BLACK_KING + 1
+PROMOTED[WHITE_MAN + 1, 28:32] = WHITE_KING + 1
+PROMOTED[BLACK_KING + 1, 28:32] = BLACK_TRIPLE_KING + 1
+PROMOTED[WHITE_KING + 1, 0:4] = WHITE_TRIPLE_KING + 1
+
+
+class BatchCheckers:
+    """
+    Represents N Super-Checkers games stepped in lockstep, with every board held in one (N, 32) int8 array.
+    Moves are indices into a fixed table of MOVE_COUNT move slots, one per pair of squares sharing a diagonal.
+    """
+
+    def __init__(self, game_count, max_plies=400):
+        self._game_count = game_count
+        self._max_plies = max_plies
+        self.reset()
+
+    def reset(self):
+        """Put every game back to the starting position"""
+        game_count = self._game_count
+        self._boards = np.zeros((game_count, 33), dtype=np.int8)
+        self._boards[:, 0:12] = WHITE_MAN + 1
+        self._boards[:, 20:32] = BLACK_MAN + 1
+        self._player_turns = np.zeros(game_count, dtype=np.int8)
+        self._continuation_squares = np.full(game_count, -1, dtype=np.intp)
+        self._captured_pieces_counts = np.zeros((game_count, 2), dtype=np.int16)
+        self._plies = np.zeros(game_count, dtype=np.int32)
+        self._winners = np.full(game_count, -1, dtype=np.int8)
+        self._done = np.zeros(game_count, dtype=bool)
+        self._legal = self.compute_legal_moves(np.arange(game_count))
+
+    def set_positions(self, positions):
+        """Set up the first games at (bitboards, color index to move, continuation square index or None) positions,
+        e.g. taken from Checkers games, and mark the other games as done. Each color's captured pieces count is the
+        number of pieces it has taken off a full set of 12, so that a game still ends once a color has none left"""
+        game_count = len(positions)
+        self.reset()
+        self._boards[:] = EMPTY
+        for index, (bitboards, player_turn, continuation_square) in enumerate(positions):
+            board = self._boards[index]
+            for piece, bitboard in enumerate(bitboards):
+                while bitboard:
+                    square_bit = bitboard & -bitboard
+                    board[square_bit.bit_length() - 1] = piece + 1
+                    bitboard ^= square_bit
+            self._player_turns[index] = player_turn
+            self._continuation_squares[index] = -1 if continuation_square is None else continuation_square
+
+        rows = np.arange(game_count)
+        colors = PIECE_COLOR[self._boards[:game_count, :32]]
+        self._captured_pieces_counts[:game_count, 0] = 12 - (colors == 1).sum(axis=1)
+        self._captured_pieces_counts[:game_count, 1] = 12 - (colors == 0).sum(axis=1)
+        self._legal[:] = False
+        self._legal[rows] = self.compute_legal_moves(rows)
+        self._done[game_count:] = True
+        stuck = ~self._legal[rows].any(axis=1)
+        self._winners[rows[stuck]] = 1 - self._player_turns[rows[stuck]]
+        self._done[rows[stuck]] = True
+
+    def get_game_count(self):
+        """Retrieve the number of games"""
+        return self._game_count
+
+    def get_boards(self):
+        """Retrieve the (N, 32) boards, 0 for an empty square, otherwise the Checkers piece class plus one"""
+        return self._boards[:, :32]
+
+    def get_player_turns(self):
+        """Retrieve the color to move of each game (0 for Black, 1 for White)"""
+        return self._player_turns
+
+    def get_captured_pieces_counts(self):
+        """Retrieve the (N, 2) number of pieces captured by Black and by White"""
+        return self._captured_pieces_counts
+
+    def get_plies(self):
+        """Retrieve the number of moves and jumps played in each game"""
+        return self._plies
+
+    def get_winners(self):
+        """Retrieve the winning color of each game, -1 while it is running or if it was drawn"""
+        return self._winners
+
+    def get_done(self):
+        """Retrieve which games have finished"""
+        return self._done
+
+    def all_done(self):
+        """Return True once every game has finished"""
+        return bool(self._done.all())
+
+    def legal_moves(self):
+        """Retrieve the (N, MOVE_COUNT) mask of the legal move slots of every game, all False once it is done"""
+        return self._legal
+
+    def get_moves(self, index):
+        """Return the legal (starting square location, destination square location) pairs of one game"""
+        return [MOVE_SLOT_COORDS[slot] for slot in np.flatnonzero(self._legal[index])]
+
+    def random_moves(self, rng):
+        """Pick a uniformly random legal move slot for every game (-1 for the games that are done)"""
+        scores = rng.random((self._game_count, MOVE_COUNT), dtype=np.float32)
+        scores[~self._legal] = -1.0
+        moves = scores.argmax(axis=1)
+        moves[self._done] = -1
+        return moves
+
+    def compute_legal_moves(self, rows):
+        """Return the legal move slot mask of the games in rows"""
+        # Only the piece that has just jumped can move, and it has to jump again (capturing, for a triple king)
+        continuation_squares = self._continuation_squares[rows][:, None]
+        pending = continuation_squares >= 0
+        legal = self.compute_slot_legality(rows, ALL_MOVE_SLOTS, pending)
+        legal &= ~pending | ((MOVE_STARTS[None, :] == continuation_squares) & ~MOVE_IS_STEP[None, :])
+        legal[self._done[rows]] = False
+        return legal
+
+    def compute_slot_legality(self, rows, slots, continuing=False):
+        """Return which move slots are legal in the games in rows, ignoring any pending jump continuation,
+        following the same rules as Checkers. slots is (1, k) for the same slots in every game or (n, k).
+        Where continuing (True, or an (n, 1) boolean array) is set, triple king jumps have to capture"""
+        boards = self._boards[rows, :32]
+        player_turns = self._player_turns[rows][:, None]
+        colors = PIECE_COLOR[boards]
+
+        start_squares = MOVE_STARTS[slots]
+        ranks = gather_squares(PIECE_RANK[boards], start_squares)
+        own = gather_squares(colors == player_turns, start_squares)
+        destination_empty = gather_squares(boards == EMPTY, MOVE_DESTINATIONS[slots])
+
+        # Count the opponent pieces in between the start and destination of each slot by masking the packed
+        # occupancy bitboard
+        between_masks = MOVE_BETWEEN_MASKS[slots]
+        capture_counts = np.bitwise_count(pack_bitboards(colors == 1 - player_turns)[:, None] & between_masks)
+
+        step = MOVE_IS_STEP[slots]
+        forward = MOVE_IS_UP[slots] == (player_turns == 0)
+        is_man = ranks == MAN
+        return own & destination_empty & (
+            (step & (~is_man | forward))
+            | (is_man & forward & (MOVE_DISTANCES[slots] == 2) & (capture_counts == 1))
+            | ((ranks == KING) & ~step & (capture_counts == 1))
+            | ((ranks == TRIPLE_KING) & ~step & (capture_counts <= 2)
+               & (capture_counts >= continuing)))
+
+    def step(self, moves):
+        """Play one move slot in every game, -1 (or a finished game) leaves a game unchanged"""
+        moves = np.asarray(moves)
+        rows = np.flatnonzero((moves >= 0) & ~self._done)
+        slots = moves[rows]
+        start_squares = MOVE_STARTS[slots]
+        destination_squares = MOVE_DESTINATIONS[slots]
+        player_turns = self._player_turns[rows]
+
+        # Move the pieces
+        pieces = self._boards[rows, start_squares]
+        self._boards[rows, start_squares] = EMPTY
+        self._boards[rows, destination_squares] = pieces
+
+        # Capture the opponent pieces in between, friendly pieces jumped by a triple king stay on the board
+        between_squares = MOVE_BETWEEN[slots]
+        between = self._boards[rows[:, None], between_squares]
+        captured = PIECE_COLOR[between] == (1 - player_turns)[:, None]
+        self._boards[rows[:, None], between_squares] = np.where(captured, EMPTY, between)
+        self._captured_pieces_counts[rows, player_turns] += captured.sum(axis=1, dtype=np.int16)
+
+        # A piece that has jumped keeps the turn while it can jump again, checked before promotion; a triple king
+        # only after a jump that captured, and only to capture again
+        ranks = PIECE_RANK[pieces]
+        may_continue = (MOVE_DISTANCES[slots] >= 2) & ((ranks != TRIPLE_KING) | captured.any(axis=1))
+        continuing = np.zeros(len(rows), dtype=bool)
+        if may_continue.any():
+            jump_slots = SQUARE_JUMP_SLOTS[destination_squares[may_continue]]
+            continuing[may_continue] = self.compute_slot_legality(rows[may_continue], jump_slots, True).any(axis=1)
+
+        self._continuation_squares[rows] = np.where(continuing, destination_squares, -1)
+        self._player_turns[rows] = np.where(continuing, player_turns, 1 - player_turns)
+        self._boards[rows, destination_squares] = PROMOTED[pieces, destination_squares]
+        self._plies[rows] += 1
+
+        # A player wins by capturing all 12 opponent pieces, the side to move loses when it has no legal move
+        self._legal[rows] = self.compute_legal_moves(rows)
+        winners = np.where(self._captured_pieces_counts[rows] >= 12)
+        self._winners[rows[winners[0]]] = winners[1]
+        stuck = ~self._legal[rows].any(axis=1) & (self._winners[rows] < 0)
+        self._winners[rows[stuck]] = 1 - self._player_turns[rows[stuck]]
+        self._done[rows] = (self._winners[rows] >= 0) | (self._plies[rows] >= self._max_plies)
+        self._legal[rows[self._done[rows]]] = False
+
+
+def pack_bitboards(squares):
+    """Pack an (n, 32) boolean array into n uint32 bitboards, square 0 in the lowest bit"""
+    return np.packbits(squares, axis=1, bitorder="little").view("<u4").ravel()
+
+
+def gather_squares(values, squares):
+    """Pick values[i, squares[i, j]] from an (n, 32) array, squares being (1, k) or (n, k)"""
+    if squares.shape[0] == 1:
+        return values[:, squares[0]]
+    return np.take_along_axis(values, squares, axis=1)
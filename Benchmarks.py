@@ -0,0 +1,250 @@
+# Author: Anson Poon
+# GitHub username: anson-poon
+# Description: Microbenchmarks for the Super-Checkers move path
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from Checkers import *
+import numpy as np
+from BatchCheckers import BatchCheckers
+from Engine import Engine
+from MCTS import MCTS
+from Perft import perft, create_reference_position
+
+
+def time_per_call(function, args_list, iterations):
+    """Return the average latency in microseconds of calling function with every args tuple in args_list"""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        for args in args_list:
+            function(*args)
+    elapsed = time.perf_counter() - start_time
+    return elapsed / (iterations * len(args_list)) * 1e6
+
+
+def create_king_position():
+    """Create a king-heavy position with long diagonals open for king and triple king jumps"""
+    game = Checkers()
+    game.create_player("Adam", "White")
+    game.create_player("Lucy", "Black")
+    game.clear_board()
+    game.set_piece((0, 1), "B K")
+    game.set_piece((7, 0), "BTK")
+    game.set_piece((2, 3), " W ")
+    game.set_piece((4, 3), "W K")
+    game.set_piece((5, 6), " W ")
+    game.set_piece((3, 6), " B ")
+    return game
+
+
+def bench_king_jump(iterations=20000):
+    """Report the latency of king and triple king jump validation, and of the king jump opportunity query run
+    after every king jump"""
+    game = create_king_position()
+    king_jumps = [((0, 1), (3, 4), "B K"), ((0, 1), (6, 7), "B K"), ((0, 1), (1, 0), "B K")]
+    triple_king_jumps = [((7, 0), (2, 5), "BTK"), ((7, 0), (0, 7), "BTK"), ((7, 0), (6, 1), "BTK")]
+    king_opportunities = [((0, 1), "B K"), ((4, 3), "W K")]
+
+    king_latency = time_per_call(game.validate_king_jump, king_jumps, iterations)
+    triple_king_latency = time_per_call(game.validate_triple_king_jump, triple_king_jumps, iterations)
+    opportunity_latency = time_per_call(game.validate_king_jump_opportunity, king_opportunities, iterations)
+    print(f"validate_king_jump:        {king_latency:8.2f} us/call")
+    print(f"validate_triple_king_jump: {triple_king_latency:8.2f} us/call")
+    print(f"king jump opportunity:     {opportunity_latency:8.2f} us/call")
+
+
+def create_triple_king_positions(position_count, seed=0):
+    """Create random triple-king-heavy positions: three triple kings a side among a few kings and regular
+    pieces, Black to move"""
+    rng = random.Random(seed)
+    pieces = ["BTK", "BTK", "BTK", "WTK", "WTK", "WTK", "B K", "W K", " B ", " B ", " W ", " W "]
+    games = []
+    for _ in range(position_count):
+        game = Checkers()
+        game.create_player("Adam", "White")
+        game.create_player("Lucy", "Black")
+        game.clear_board()
+        for square, checker_piece in zip(rng.sample(range(32), len(pieces)), pieces):
+            game.set_piece(SQUARE_COORD[square], checker_piece)
+        game.set_position(game.get_bitboards(), "Black")
+        games.append(game)
+    return games
+
+
+def bench_triple_king(position_count=200, iterations=50, depth=3):
+    """Report the latency of the triple king jump opportunity query, and the perft speed, over random
+    triple-king-heavy positions"""
+    games = create_triple_king_positions(position_count)
+    queries = [(game, SQUARE_COORD[square], PIECE_SYMBOLS[piece]) for game in games
+               for piece in (BLACK_TRIPLE_KING, WHITE_TRIPLE_KING) for square in range(32)
+               if game.get_piece_class(square) == piece]
+    opportunity_count = sum(1 for game, square_location, checker_piece in queries
+                            if game.validate_triple_king_jump_opportunity(square_location, checker_piece))
+
+    latency = time_per_call(Checkers.validate_triple_king_jump_opportunity, queries, iterations)
+    print(f"{len(queries)} triple kings, {opportunity_count} with a capturing jump")
+    print(f"triple king opportunity:   {latency:8.2f} us/call")
+
+    start_time = time.perf_counter()
+    node_count = sum(perft(game, depth) for game in games)
+    elapsed = time.perf_counter() - start_time
+    print(f"perft depth {depth}: {node_count} nodes in {elapsed:.2f} s")
+    print(f"triple king perft speed:   {node_count / elapsed:8.0f} nodes/s")
+
+
+def bench_capture_sequences(position_count=200, iterations=20):
+    """Report the latency of enumerating every complete capture sequence over random triple-king-heavy positions,
+    for either side to move"""
+    games = []
+    for game in create_triple_king_positions(position_count) + create_triple_king_positions(position_count, 1):
+        game.set_position(game.get_bitboards(), COLORS[len(games) % 2])
+        games.append(game)
+    sequence_count = sum(len(game.capture_sequences()) for game in games)
+    longest = max((len(captured) for game in games for _, captured in game.capture_sequences()), default=0)
+    latency = time_per_call(Checkers.capture_sequences, [(game,) for game in games], iterations)
+    print(f"{len(games)} positions, {sequence_count} capture sequences, up to {longest} captures")
+    print(f"capture sequences:         {latency:8.2f} us/call")
+
+
+def bench_evaluate(iterations=200000):
+    """Report the latency of the incremental evaluation"""
+    game = create_king_position()
+    latency = time_per_call(game.evaluate, [()], iterations)
+    print(f"evaluate:                  {latency:8.3f} us/call")
+
+
+def bench_engine(time_ms=2000):
+    """Report the alpha-beta engine search speed from the opening position"""
+    game = Checkers()
+    game.create_player("Adam", "White")
+    game.create_player("Lucy", "Black")
+    engine = Engine()
+    move = engine.best_move(game, time_ms)
+    print(f"best move: {move}  depth: {engine.get_depth()}  nodes: {engine.get_nodes()}")
+    print(f"search speed:              {engine.get_nodes_per_second():8.0f} nodes/s")
+    print(f"transposition hit rate:    {engine.get_transposition_table().get_hit_rate():8.1%}")
+
+
+def bench_perft(depths=(("start", 6), ("kings", 6), ("triple_kings", 5), ("promotion", 6))):
+    """Report the move generation and make/unmake speed over perft of the reference positions"""
+    total_nodes = 0
+    total_elapsed = 0.0
+    for name, depth in depths:
+        game = create_reference_position(name)
+        start_time = time.perf_counter()
+        node_count = perft(game, depth)
+        elapsed = time.perf_counter() - start_time
+        total_nodes += node_count
+        total_elapsed += elapsed
+        print(f"perft {name} depth {depth}: {node_count} nodes in {elapsed:.2f} s")
+    print(f"perft speed:               {total_nodes / total_elapsed:8.0f} nodes/s")
+
+
+def bench_batch(game_count=10000):
+    """Report the speed of stepping random games in lockstep with BatchCheckers"""
+    batch = BatchCheckers(game_count)
+    rng = np.random.default_rng(0)
+    start_time = time.perf_counter()
+    while not batch.all_done():
+        batch.step(batch.random_moves(rng))
+    elapsed = time.perf_counter() - start_time
+    plies = int(batch.get_plies().sum())
+    print(f"{game_count} games, {plies} moves in {elapsed:.2f} s")
+    print(f"batch speed:               {plies / elapsed:8.0f} moves/s")
+
+
+def bench_mcts(time_ms=2000):
+    """Report the MCTS playout speed from the triple king reference position, with single rollouts, batched
+    rollouts, and a tree per core"""
+    game = create_reference_position("triple_kings")
+    configurations = (("serial", 1, 0), ("batch 64", 1, 64), (f"{os.cpu_count()} workers", os.cpu_count(), 0))
+    for label, workers, batch_size in configurations:
+        with MCTS(workers=workers, batch_size=batch_size, seed=0) as mcts:
+            move = mcts.best_move(game, time_ms)
+            print(f"mcts {label + ':':17} {mcts.get_playouts_per_second():8.0f} playouts/s  best move: {move}")
+
+
+def play_random_games(game_count, trace_level, trace_sink=None):
+    """Play random games through play_game at the trace level and return the moves played per second"""
+    rng = random.Random(0)
+    move_count = 0
+    elapsed = 0.0
+    for _ in range(game_count):
+        game = Checkers()
+        game.create_player("Adam", "White")
+        game.create_player("Lucy", "Black")
+        game.set_trace_level(trace_level, trace_sink)
+        moves = game.legal_moves()
+        while moves:
+            starting_sq_loc, destination_sq_loc = rng.choice(moves)
+            start_time = time.perf_counter()
+            game.play_game(game.get_current_player_name(), starting_sq_loc, destination_sq_loc)
+            elapsed += time.perf_counter() - start_time
+            move_count += 1
+            moves = game.legal_moves()
+    return move_count / elapsed
+
+
+def bench_trace(game_count=200):
+    """Report the play_game speed with tracing off and with every event formatted into a buffer"""
+    buffer = io.StringIO()
+
+    def buffer_trace(trace_level, event, fields):
+        buffer.write(format_trace(trace_level, event, fields) + "\n")
+
+    print(f"trace off:                 {play_random_games(game_count, TRACE_OFF):8.0f} moves/s")
+    print(f"trace info:                {play_random_games(game_count, TRACE_INFO, buffer_trace):8.0f} moves/s")
+    print(f"trace debug:               {play_random_games(game_count, TRACE_DEBUG, buffer_trace):8.0f} moves/s")
+
+
+def bench_memory(game_count=100000, plies=10):
+    """Report the memory held by game_count live games, each a few random plies into the game. The games are
+    played untraced and then restored from their snapshots while tracing, which builds the same objects"""
+    rng = random.Random(0)
+    snapshots = []
+    for game_index in range(game_count):
+        game = Checkers()
+        game.create_player(f"Black {game_index}", "Black")
+        game.create_player(f"White {game_index}", "White")
+        for _ in range(plies):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.play_game(game.get_current_player_name(), *rng.choice(moves))
+        snapshots.append(game.to_bytes())
+
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    games = [Checkers.from_bytes(snapshot) for snapshot in snapshots]
+    memory_used = tracemalloc.get_traced_memory()[0] - memory_before - sys.getsizeof(games)
+    tracemalloc.stop()
+    print(f"{len(games)} live games:        {memory_used / 2 ** 20:8.1f} MiB")
+    print(f"memory per game:           {memory_used / game_count:8.0f} bytes")
+
+
+BENCHMARKS = {
+    "king_jump": bench_king_jump,
+    "triple_king": bench_triple_king,
+    "capture_sequences": bench_capture_sequences,
+    "evaluate": bench_evaluate,
+    "engine": bench_engine,
+    "perft": bench_perft,
+    "batch": bench_batch,
+    "trace": bench_trace,
+    "memory": bench_memory,
+    "mcts": bench_mcts,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
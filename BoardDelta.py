@@ -0,0 +1,83 @@
+class BoardDelta:
+    """
+    Represents what one play_game call changed on the board: the piece moved from the starting square to the
+    destination square, the squares of the pieces it captured, whether it was promoted, and whose turn it is now.
+    Applying the deltas of a game in order to a board keeps it up to date without sending whole boards.
+    """
+
+    def __init__(self, player_color, starting_sq_loc, destination_sq_loc, piece_symbol, captured_sq_locs,
+                 promoted, player_turn, turn_changed):
+        self._player_color = player_color
+        self._starting_sq_loc = starting_sq_loc
+        self._destination_sq_loc = destination_sq_loc
+        self._piece_symbol = piece_symbol
+        self._captured_sq_locs = captured_sq_locs
+        self._promoted = promoted
+        self._player_turn = player_turn
+        self._turn_changed = turn_changed
+
+    def __eq__(self, other):
+        return isinstance(other, BoardDelta) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        # Square locations are hashed as tuples, they compare equal to lists through to_dict
+        return hash((self._player_color, tuple(self._starting_sq_loc), tuple(self._destination_sq_loc),
+                     self._piece_symbol, tuple(tuple(sq_loc) for sq_loc in self._captured_sq_locs), self._promoted,
+                     self._player_turn, self._turn_changed))
+
+    def __repr__(self):
+        return f"BoardDelta({self.to_dict()})"
+
+    def get_player_color(self):
+        """Retrieve the piece color of the player who moved"""
+        return self._player_color
+
+    def get_starting_sq_loc(self):
+        """Retrieve the square location the piece moved from"""
+        return self._starting_sq_loc
+
+    def get_destination_sq_loc(self):
+        """Retrieve the square location the piece moved to"""
+        return self._destination_sq_loc
+
+    def get_piece_symbol(self):
+        """Retrieve the symbol of the piece on the destination square, after any promotion"""
+        return self._piece_symbol
+
+    def get_captured_sq_locs(self):
+        """Retrieve the square locations of the pieces captured, in board order"""
+        return self._captured_sq_locs
+
+    def is_promotion(self):
+        """Return True if the piece was promoted"""
+        return self._promoted
+
+    def get_player_turn(self):
+        """Retrieve the piece color of the player whose turn it is after the move"""
+        return self._player_turn
+
+    def is_turn_changed(self):
+        """Return True if the turn passed to the opponent, False if the piece has to continue jumping"""
+        return self._turn_changed
+
+    def apply(self, board):
+        """Apply the delta to a 2D list board as returned by get_board and return the board"""
+        board[self._starting_sq_loc[0]][self._starting_sq_loc[1]] = "   "
+        for row, col in self._captured_sq_locs:
+            board[row][col] = "   "
+        board[self._destination_sq_loc[0]][self._destination_sq_loc[1]] = self._piece_symbol
+        return board
+
+    def to_dict(self):
+        """Return the delta as a dictionary of JSON types"""
+        return {"player": self._player_color, "from": list(self._starting_sq_loc),
+                "to": list(self._destination_sq_loc), "piece": self._piece_symbol,
+                "captured": [list(sq_loc) for sq_loc in self._captured_sq_locs], "promotion": self._promoted,
+                "turn": self._player_turn, "turn_changed": self._turn_changed}
+
+    @classmethod
+    def from_dict(cls, fields):
+        """Create a delta from a dictionary returned by to_dict"""
+        return cls(fields["player"], tuple(fields["from"]), tuple(fields["to"]), fields["piece"],
+                   tuple(tuple(sq_loc) for sq_loc in fields["captured"]), fields["promotion"], fields["turn"],
+                   fields["turn_changed"])
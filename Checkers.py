@@ -1,125 +1,567 @@
-import numpy as np
+import random
+import struct
+import sys
+from BoardDelta import *
 from Player import *
 
+# Trace levels, a Checkers instance only reports the events at or below its level (off by default)
+TRACE_OFF, TRACE_INFO, TRACE_DEBUG = range(3)
+TRACE_LEVEL_NAMES = ("OFF", "INFO", "DEBUG")
+
+# Piece classes, each one owns a 32-bit bitboard over the playable (dark) squares
+BLACK_MAN, BLACK_KING, BLACK_TRIPLE_KING, WHITE_MAN, WHITE_KING, WHITE_TRIPLE_KING = range(6)
+PIECE_SYMBOLS = (" B ", "B K", "BTK", " W ", "W K", "WTK")
+PIECE_CLASSES = {symbol: piece for piece, symbol in enumerate(PIECE_SYMBOLS)}
+CHECKER_DETAILS = ("Black", "Black_king", "Black_Triple_King", "White", "White_king", "White_Triple_King")
+COLORS = ("Black", "White")
+COLOR_INDEX = {"Black": 0, "White": 1}
+
+# Square index (0-31) of each playable board coordinate, None for the unplayable (light) squares
+SQUARE_INDEX = [[row * 4 + col // 2 if (row + col) % 2 == 1 else None for col in range(8)] for row in range(8)]
+SQUARE_COORD = [(row, col) for row in range(8) for col in range(8) if (row + col) % 2 == 1]
+
+# Diagonal directions, as (row step, column step) pairs
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = range(4)
+DIAGONAL_STEPS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+# For each square index and direction, the square indices along the diagonal ordered outward to the board edge
+DIAGONAL_RAYS = tuple(
+    tuple(
+        tuple(SQUARE_INDEX[row + row_step * step][col + col_step * step] for step in range(1, 8)
+              if 0 <= row + row_step * step <= 7 and 0 <= col + col_step * step <= 7)
+        for row_step, col_step in DIAGONAL_STEPS)
+    for row, col in SQUARE_COORD)
+
+# Forward directions of the regular pieces of each color (Black moves up the board, White moves down)
+MAN_DIRECTIONS = ((UP_LEFT, UP_RIGHT), (DOWN_LEFT, DOWN_RIGHT))
+
+# Piece class each piece class is promoted to on each square index, itself where it is not promoted
+PROMOTED_PIECES = tuple(
+    tuple((BLACK_KING if row == 0 else piece) if piece == BLACK_MAN
+          else (WHITE_KING if row == 7 else piece) if piece == WHITE_MAN
+          else (BLACK_TRIPLE_KING if row == 7 else piece) if piece == BLACK_KING
+          else (WHITE_TRIPLE_KING if row == 0 else piece) if piece == WHITE_KING
+          else piece
+          for row, _ in SQUARE_COORD)
+    for piece in range(6))
+
+# Zobrist keys for each piece class on each square, White to move, and the square of the piece that has to
+# continue jumping, drawn from a fixed seed so that hashes are reproducible across processes
+_zobrist_random = random.Random(20240613)
+ZOBRIST_PIECE_KEYS = tuple(tuple(_zobrist_random.getrandbits(64) for _ in range(32)) for _ in range(6))
+ZOBRIST_TURN_KEY = _zobrist_random.getrandbits(64)
+ZOBRIST_CONTINUATION_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(32))
+
+# Material value of each piece class, and its positional value on each square index: regular pieces gain value as
+# they advance towards promotion, kings and triple kings as they get closer to the center of the board
+PIECE_VALUES = (100, 250, 400, 100, 250, 400)
+PIECE_SQUARE_VALUES = (
+    tuple(3 * (7 - row) + min(col, 7 - col) for row, col in SQUARE_COORD),
+    tuple(4 * min(row, 7 - row, col, 7 - col) for row, col in SQUARE_COORD),
+    tuple(4 * min(row, 7 - row, col, 7 - col) for row, col in SQUARE_COORD),
+    tuple(3 * row + min(col, 7 - col) for row, col in SQUARE_COORD),
+    tuple(4 * min(row, 7 - row, col, 7 - col) for row, col in SQUARE_COORD),
+    tuple(4 * min(row, 7 - row, col, 7 - col) for row, col in SQUARE_COORD))
+
+# The same values signed from Black's point of view, which is how the running scores are kept
+SIGNED_PIECE_VALUES = tuple(value if piece < WHITE_MAN else -value for piece, value in enumerate(PIECE_VALUES))
+SIGNED_PIECE_SQUARE_VALUES = tuple(tuple(value if piece < WHITE_MAN else -value for value in square_values)
+                                   for piece, square_values in enumerate(PIECE_SQUARE_VALUES))
+
+# A game snapshot starts with its format version, the flags below, the square index of the last piece that jumped
+# and of the piece that has to continue jumping (NO_SQUARE for none), and the board as three bit planes holding
+# piece class + 1 on each square. Each player follows: color index, king, triple king and captured pieces
+# counts, and the length of its UTF-8 name, then the name
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<BBBB3I")
+SNAPSHOT_PLAYER = struct.Struct("<BBBBH")
+NO_SQUARE = 0xFF
+
+# Snapshot flags, the color index + 1 of the player who moved last (0 for none) is stored above them
+SNAPSHOT_WHITE_TO_MOVE = 1
+SNAPSHOT_PREV_MOVE = 2
+SNAPSHOT_PREV_JUMP = 4
+SNAPSHOT_PREV_PLAYER_SHIFT = 3
+
+
 class Checkers:
     """
-    Represents a modified checkers game as played.
+    Represents a modified checkers game as played. The players are kept by color index (0 for Black, 1 for White),
+    a player name is only resolved to its color where it enters the game, in play_game and get_player.
     """
 
+    __slots__ = ("_bitboards", "_players", "_player_turn", "_prev_color_index", "_prev_piece_coord", "_prev_move",
+                 "_prev_jump", "_hash", "_hash_continuation_square", "_piece_counts", "_material_score",
+                 "_positional_score", "_trace_level", "_trace_sink", "_subscribers")
+
     def __init__(self):
-        self._board = []
-        self._player = {}
+        self._bitboards = [0] * 6
+        self._players = [None, None]
         self._player_turn = "Black"
-        self._prev_player = None
+        self._prev_color_index = None
         self._prev_piece_coord = None
         self._prev_move = False
         self._prev_jump = False
+        self._hash = 0
+        self._hash_continuation_square = None
+        self._piece_counts = [0] * 6
+        self._material_score = 0
+        self._positional_score = 0
+        self._trace_level = TRACE_OFF
+        self._trace_sink = print_trace
+        self._subscribers = ()
         self.create_board()
 
+    def __getstate__(self):
+        """Copies and pickles of the game leave its subscribers behind"""
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["_subscribers"] = ()
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def create_player(self, player_name, piece_color):
         """Create a player object and assigns it with a piece color"""
-        self._player[player_name] = Player(player_name, piece_color)
-        return self._player[player_name]
+        player = Player(player_name, piece_color)
+        self._players[COLOR_INDEX[piece_color]] = player
+        self.compute_player_counts()
+        return player
+
+    def get_player(self, player_name):
+        """Retrieve the player object of the player name"""
+        return self._players[self.get_player_color_index(player_name)]
+
+    def get_player_color_index(self, player_name):
+        """Return the color index of the player name, or raise an InvalidPlayer exception"""
+        for color_index, player in enumerate(self._players):
+            if player is not None and player.get_player_name() == player_name:
+                return color_index
+        raise InvalidPlayer("Player not found")
 
     def get_current_player_name(self):
-        for player in self._player.values():
-            if player.get_piece_color() == self._player_turn:
-                return player.get_player_name()
+        player = self._players[COLOR_INDEX[self._player_turn]]
+        if player is not None:
+            return player.get_player_name()
+
+    def get_trace_level(self):
+        """Retrieve the trace level of the game"""
+        return self._trace_level
+
+    def set_trace_level(self, trace_level, trace_sink=None):
+        """Report the events at or below the trace level to trace_sink(trace_level, event, fields), printing
+        them by default. Callers check the level first so that nothing is built while tracing is off"""
+        self._trace_level = trace_level
+        self._trace_sink = trace_sink or print_trace
+
+    def trace(self, trace_level, event, **fields):
+        """Report an event with its fields to the trace sink"""
+        self._trace_sink(trace_level, event, fields)
+
+    def subscribe(self, callback):
+        """Call callback(board_delta) with the BoardDelta of every move played through play_game from now on"""
+        self._subscribers += (callback,)
+
+    def unsubscribe(self, callback):
+        """Stop calling a subscribed callback"""
+        subscribers = list(self._subscribers)
+        subscribers.remove(callback)
+        self._subscribers = tuple(subscribers)
+
+    def create_delta(self, bitboards, starting_sq_loc, destination_sq_loc, player_color):
+        """Return the BoardDelta of the move from starting_sq_loc to destination_sq_loc, given the bitboards
+        before it was played"""
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        start_bit = 1 << start_square
+        occupied_before = occupied_after = 0
+        for bitboard in bitboards:
+            occupied_before |= bitboard
+        for bitboard in self._bitboards:
+            occupied_after |= bitboard
+
+        captured_mask = occupied_before & ~occupied_after & ~start_bit
+        captured_sq_locs = []
+        while captured_mask:
+            square_bit = captured_mask & -captured_mask
+            captured_sq_locs.append(SQUARE_COORD[square_bit.bit_length() - 1])
+            captured_mask ^= square_bit
+
+        start_piece = next(piece for piece, bitboard in enumerate(bitboards) if bitboard & start_bit)
+        piece = self.get_piece_class(SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]])
+        return BoardDelta(player_color, starting_sq_loc, destination_sq_loc, PIECE_SYMBOLS[piece],
+                          tuple(captured_sq_locs), piece != start_piece, self._player_turn,
+                          self._player_turn != player_color)
+
+    def get_hash(self):
+        """Retrieve the Zobrist hash of the position, including the side to move and any pending jump continuation"""
+        return self._hash
+
+    def compute_hash(self):
+        """Compute the Zobrist hash of the position from scratch"""
+        position_hash = 0
+        for piece, bitboard in enumerate(self._bitboards):
+            while bitboard:
+                square_bit = bitboard & -bitboard
+                position_hash ^= ZOBRIST_PIECE_KEYS[piece][square_bit.bit_length() - 1]
+                bitboard ^= square_bit
+        if self._player_turn == "White":
+            position_hash ^= ZOBRIST_TURN_KEY
+        if self._hash_continuation_square is not None:
+            position_hash ^= ZOBRIST_CONTINUATION_KEYS[self._hash_continuation_square]
+        return position_hash
+
+    def set_hash_continuation(self, square):
+        """Hash the square index of the piece that has to continue jumping (None once no continuation is pending)"""
+        if self._hash_continuation_square is not None:
+            self._hash ^= ZOBRIST_CONTINUATION_KEYS[self._hash_continuation_square]
+        if square is not None:
+            self._hash ^= ZOBRIST_CONTINUATION_KEYS[square]
+        self._hash_continuation_square = square
+
+    def get_player_turn(self):
+        """Retrieve the piece color of the player whose turn it is"""
+        return self._player_turn
 
     def play_game(self, player_name, starting_sq_loc, destination_sq_loc):
         """"""
+        bitboards = self._bitboards[:] if self._subscribers else None
         start_piece = None
         des_piece = None  # IS DES PIECE NECESSARY?
-        piece_color = None
-        opponent_player_name = ""
 
-        # Get the opponent player's name
-        for player in self._player:
-            if player != player_name:
-                opponent_player_name = player
-
-        # Validate player name and assign piece color
-        if self.validate_player_name(player_name):
-            piece_color = self._player[player_name].get_piece_color()
-            print(f"Player piece color is: {piece_color}")
+        # Validate player name and assign piece color, the player is known by its color index from here on
+        color_index = self.get_player_color_index(player_name)
+        piece_color = COLORS[color_index]
 
         # Validate square location exist, then retrieve starting/destination piece symbol
         if self.validate_square_location(starting_sq_loc) and self.validate_square_location(destination_sq_loc):
             start_piece = self.get_piece_symbol(starting_sq_loc)
             des_piece = self.get_piece_symbol(destination_sq_loc)
 
-        # print(f"Starting position is: {start_piece}")
-        # print(f"Destination position is: {des_piece}")
-
         # Validate square location piece belongs to current player
         self.validate_square_location_ownership(start_piece, piece_color)
 
         # Validate if the operation is a move or a regular/king/triple king jump
         if self.validate_move(starting_sq_loc, destination_sq_loc, start_piece):
             # Validate if the player is playing out of turn
-            self.validate_out_of_turn(player_name, starting_sq_loc, move_or_jump="move")
-            print("This is a move")
+            self.validate_out_of_turn(color_index, starting_sq_loc, move_or_jump="move")
+            if self._trace_level >= TRACE_INFO:
+                self.trace(TRACE_INFO, "move", player=player_name, start=starting_sq_loc,
+                           destination=destination_sq_loc)
             self.set_move(starting_sq_loc, destination_sq_loc, start_piece)
-            self.flip_turn(player_name)
+            self.flip_turn(color_index)
 
         # Validate the jump according to piece type, validate if out of turn, if not then jump piece to new location,
         # After that, validate jump opportunity, if no opportunity, flip turn
         elif self.validate_regular_jump(starting_sq_loc, destination_sq_loc, start_piece):
-            self.validate_out_of_turn(player_name, starting_sq_loc, move_or_jump="jump")
-            print("This is a regular jump")
-            self.set_regular_jump(player_name, opponent_player_name, starting_sq_loc, destination_sq_loc, start_piece)
+            self.validate_out_of_turn(color_index, starting_sq_loc, move_or_jump="jump")
+            if self._trace_level >= TRACE_INFO:
+                self.trace(TRACE_INFO, "regular_jump", player=player_name, start=starting_sq_loc,
+                           destination=destination_sq_loc)
+            self.set_regular_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
             if not self.validate_regular_jump_opportunity(destination_sq_loc, start_piece):
-                print("FLIP REGULAR")
-                self.flip_turn(player_name)
+                if self._trace_level >= TRACE_DEBUG:
+                    self.trace(TRACE_DEBUG, "flip_turn", player=player_name, square=destination_sq_loc)
+                self.flip_turn(color_index)
 
         elif self.validate_king_jump(starting_sq_loc, destination_sq_loc, start_piece):
-            self.validate_out_of_turn(player_name, starting_sq_loc, move_or_jump="jump")
-            print("This is a king jump")
-            self.set_king_jump(player_name, opponent_player_name, starting_sq_loc, destination_sq_loc, start_piece)
+            self.validate_out_of_turn(color_index, starting_sq_loc, move_or_jump="jump")
+            if self._trace_level >= TRACE_INFO:
+                self.trace(TRACE_INFO, "king_jump", player=player_name, start=starting_sq_loc,
+                           destination=destination_sq_loc)
+            self.set_king_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
             if not self.validate_king_jump_opportunity(destination_sq_loc, start_piece):
-                print("FLIP KING")
-                self.flip_turn(player_name)
+                if self._trace_level >= TRACE_DEBUG:
+                    self.trace(TRACE_DEBUG, "flip_turn", player=player_name, square=destination_sq_loc)
+                self.flip_turn(color_index)
 
         elif self.validate_triple_king_jump(starting_sq_loc, destination_sq_loc, start_piece):
-            self.validate_out_of_turn(player_name, starting_sq_loc, move_or_jump="jump")
-            print("This is a triple king jump")
-            self.set_triple_king_jump(player_name, opponent_player_name, starting_sq_loc, destination_sq_loc,
-                                      start_piece)
-            if not self.validate_triple_king_jump_opportunity(destination_sq_loc, start_piece):
-                self.flip_turn(player_name)
+            self.validate_out_of_turn(color_index, starting_sq_loc, move_or_jump="jump")
+            # A triple king continuing to jump has to capture, or sliding and jumping friendly pieces would never end
+            # the turn
+            if (self.is_jump_continuation_pending(color_index)
+                    and not self.get_capture_count(color_index, starting_sq_loc, destination_sq_loc)):
+                raise OutofTurn("Previously is a jump, this jump has to capture an opponent's piece.")
+            if self._trace_level >= TRACE_INFO:
+                self.trace(TRACE_INFO, "triple_king_jump", player=player_name, start=starting_sq_loc,
+                           destination=destination_sq_loc)
+            capture_count = self.set_triple_king_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
+            if not capture_count or not self.validate_triple_king_jump_opportunity(destination_sq_loc, start_piece):
+                if self._trace_level >= TRACE_DEBUG:
+                    self.trace(TRACE_DEBUG, "flip_turn", player=player_name, square=destination_sq_loc)
+                self.flip_turn(color_index)
 
         else:  # Starting piece is None or Invalid move
             raise InvalidSquare("This is an invalid move")
 
-        new_start_piece = self.get_piece_symbol(starting_sq_loc)
-        new_des_piece = self.get_piece_symbol(destination_sq_loc)
-
-        # print(f"Now starting position is: {start_piece}")
-        # print(f"Now destination position is: {des_piece}")
-
-        if new_des_piece == " B " or new_des_piece == " W ":
-            if self.validate_regular_promotion(destination_sq_loc, new_des_piece):
-                self.promote_regular_piece(player_name, destination_sq_loc)
-        elif new_des_piece == "B K" or new_des_piece == "W K":
-            if self.validate_king_promotion(destination_sq_loc, new_des_piece):
-                self.promote_king_piece(player_name, destination_sq_loc)
-
-        return self._player[player_name].get_captured_pieces_count()
-
-    def validate_out_of_turn(self, player_name, square_location, move_or_jump):
-        """Validate if a player attempts to move a piece out of turn"""
-        print(self._player_turn)
-        print(self._player[player_name].get_piece_color())
-        # print(self._prev_piece_coord)
-        # print(self._prev_move)
-        # print(self._prev_jump)
+        self._prev_color_index = color_index
+        self.promote_piece(color_index, destination_sq_loc)
+
+        if bitboards is not None:
+            board_delta = self.create_delta(bitboards, tuple(starting_sq_loc), tuple(destination_sq_loc),
+                                            piece_color)
+            for callback in self._subscribers:
+                callback(board_delta)
+
+        return self._players[color_index].get_captured_pieces_count()
+
+    def make_move(self, move):
+        """Play a (starting square location, destination square location) pair returned by legal_moves without
+        validating it again, and return the undo record that unmake_move takes to restore the game"""
+        starting_sq_loc, destination_sq_loc = move
+        bitboards = self._bitboards
+        black_player, white_player = self._players
+
+        # The undo record is a flat tuple of every piece of state a move can change, unmake_move recounting the
+        # pieces of the classes whose bitboards differ from it
+        record = (bitboards[0], bitboards[1], bitboards[2], bitboards[3], bitboards[4], bitboards[5],
+                  self._player_turn, self._prev_color_index, self._prev_piece_coord, self._prev_move, self._prev_jump,
+                  self._hash, self._hash_continuation_square, self._material_score, self._positional_score,
+                  black_player.get_king_count(), black_player.get_triple_king_count(),
+                  black_player.get_captured_pieces_count(), white_player.get_king_count(),
+                  white_player.get_triple_king_count(), white_player.get_captured_pieces_count())
+
+        start_piece = self.get_piece_symbol(starting_sq_loc)
+        piece = PIECE_CLASSES[start_piece]
+        color_index = piece // 3
+
+        # Same dispatch as play_game: a one square diagonal step is a move, anything further is a jump
+        if destination_sq_loc[0] - starting_sq_loc[0] in (1, -1):
+            self.set_move(starting_sq_loc, destination_sq_loc, start_piece)
+            self.flip_turn(color_index)
+        elif piece == BLACK_MAN or piece == WHITE_MAN:
+            self.set_regular_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
+            if not self.validate_regular_jump_opportunity(destination_sq_loc, start_piece):
+                self.flip_turn(color_index)
+        elif piece == BLACK_KING or piece == WHITE_KING:
+            self.set_king_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
+            # Only whether one jump is left matters here, so the scan stops at the first one
+            if not self.get_king_captures(SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]],
+                                          self.get_occupied_mask(), self.get_color_mask(1 - color_index), True):
+                self.flip_turn(color_index)
+        else:
+            capture_count = self.set_triple_king_jump(color_index, starting_sq_loc, destination_sq_loc, start_piece)
+            if not capture_count or not self.get_triple_king_captures(
+                    SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]], self.get_occupied_mask(),
+                    self.get_color_mask(1 - color_index), True):
+                self.flip_turn(color_index)
+
+        self._prev_color_index = color_index
+        self.promote_piece(color_index, destination_sq_loc)
+
+        return record
+
+    def unmake_move(self, record):
+        """Restore the game to the state it was in before the make_move call that returned the undo record"""
+        bitboards = self._bitboards
+        black_player, white_player = self._players
+        piece_counts = self._piece_counts
+        for piece in range(6):
+            if bitboards[piece] != record[piece]:
+                piece_counts[piece] = record[piece].bit_count()
+
+        (bitboards[0], bitboards[1], bitboards[2], bitboards[3], bitboards[4], bitboards[5],
+         self._player_turn, self._prev_color_index, self._prev_piece_coord, self._prev_move, self._prev_jump,
+         self._hash, self._hash_continuation_square, self._material_score, self._positional_score,
+         black_king_count, black_triple_king_count, black_captured_pieces_count,
+         white_king_count, white_triple_king_count, white_captured_pieces_count) = record
+
+        black_player.set_king_count(black_king_count)
+        black_player.set_triple_king_count(black_triple_king_count)
+        black_player.set_captured_pieces_count(black_captured_pieces_count)
+        white_player.set_king_count(white_king_count)
+        white_player.set_triple_king_count(white_triple_king_count)
+        white_player.set_captured_pieces_count(white_captured_pieces_count)
+
+    def legal_moves(self, color=None):
+        """Return every legal (starting square location, destination square location) pair for the color,
+        by default the player whose turn it is. While a jump continuation is pending, only the jumps of
+        the piece that has just jumped are returned"""
+        color_index = COLOR_INDEX[color or self._player_turn]
+        return [(SQUARE_COORD[start_square], SQUARE_COORD[destination_square])
+                for start_square, destination_square in self.generate_moves(color_index)]
+
+    def get_continuation_square(self):
+        """Return the square index of the piece that has to continue jumping, or None if no jump continuation
+        is pending"""
+        if not self.is_jump_continuation_pending(COLOR_INDEX[self._player_turn]):
+            return None
+        return SQUARE_INDEX[self._prev_piece_coord[0]][self._prev_piece_coord[1]]
+
+    def is_jump_continuation_pending(self, color_index):
+        """Return True if the color has just jumped and has to keep jumping with the same piece"""
+        return (self._prev_jump and self._prev_color_index == color_index
+                and COLOR_INDEX[self._player_turn] == color_index)
+
+    def generate_moves(self, color_index, first_only=False):
+        """Return every legal (starting square, destination square) index pair for the color (0 for Black,
+        1 for White) in a single pass over its bitboards. With first_only, return as soon as the moves of one
+        piece are found"""
+        occupied_mask = self.get_occupied_mask()
+        opponent_mask = self.get_color_mask(1 - color_index)
+        moves = []
+
+        # Only the piece that has just jumped can move, and it has to jump again
+        if self.is_jump_continuation_pending(color_index):
+            square = SQUARE_INDEX[self._prev_piece_coord[0]][self._prev_piece_coord[1]]
+            self.add_piece_moves(moves, self.get_piece_class(square), square, occupied_mask, opponent_mask, True)
+            return moves
+
+        for piece in range(color_index * 3, color_index * 3 + 3):
+            bitboard = self._bitboards[piece]
+            while bitboard:
+                square_bit = bitboard & -bitboard
+                self.add_piece_moves(moves, piece, square_bit.bit_length() - 1, occupied_mask, opponent_mask, False)
+                if first_only and moves:
+                    return moves
+                bitboard ^= square_bit
+        return moves
+
+    def add_piece_moves(self, moves, piece, square, occupied_mask, opponent_mask, jumps_only):
+        """Append the moves and jumps of the piece on the square index to moves, walking its diagonal rays"""
+        rays = DIAGONAL_RAYS[square]
+
+        # Regular piece moves one square forward, or jumps one adjacent opponent piece forward
+        if piece == BLACK_MAN or piece == WHITE_MAN:
+            for direction in MAN_DIRECTIONS[piece // 3]:
+                ray = rays[direction]
+                if not ray:
+                    continue
+                first_bit = 1 << ray[0]
+                if not occupied_mask & first_bit:
+                    if not jumps_only:
+                        moves.append((square, ray[0]))
+                elif opponent_mask & first_bit and len(ray) > 1 and not occupied_mask & (1 << ray[1]):
+                    moves.append((square, ray[1]))
+            return
+
+        # King jumps exactly one opponent piece and can land on any empty square further along the diagonal
+        if piece == BLACK_KING or piece == WHITE_KING:
+            if not jumps_only:
+                for ray in rays:
+                    if ray and not occupied_mask & (1 << ray[0]):
+                        moves.append((square, ray[0]))
+            for _, target in self.get_king_captures(square, occupied_mask, opponent_mask):
+                moves.append((square, target))
+            return
+
+        # Triple king slides along empty squares or jumps friendly pieces and up to two opponent pieces, landing on
+        # any empty square further along the diagonal, a jump continuing a previous one has to capture
+        for ray in rays:
+            capture_count = 0
+            for target in ray:
+                target_bit = 1 << target
+                if occupied_mask & target_bit:
+                    if opponent_mask & target_bit:
+                        capture_count += 1
+                        if capture_count > 2:
+                            break
+                elif capture_count or not jumps_only:
+                    moves.append((square, target))
+
+    def capture_sequences(self, color=None):
+        """Return every complete capture sequence for the color as (path, captured) square location tuples"""
+        color_index = COLOR_INDEX[color or self._player_turn]
+        return [(tuple(SQUARE_COORD[square] for square in path), tuple(SQUARE_COORD[square] for square in captured))
+                for path, captured in self.generate_capture_sequences(color_index)]
+
+    def generate_capture_sequences(self, color_index):
+        """Return every complete capture sequence for the color as (path, captured) square index tuples"""
+        occupied_mask = self.get_occupied_mask()
+        opponent_mask = self.get_color_mask(1 - color_index)
+        sequences = []
+
+        # Only the piece that has just jumped can continue, it is already promoted if it had to be
+        if self.is_jump_continuation_pending(color_index):
+            square = SQUARE_INDEX[self._prev_piece_coord[0]][self._prev_piece_coord[1]]
+            starting_pieces = [(square, self.get_piece_class(square))]
+        else:
+            starting_pieces = []
+            for piece in range(color_index * 3, color_index * 3 + 3):
+                bitboard = self._bitboards[piece]
+                while bitboard:
+                    square_bit = bitboard & -bitboard
+                    starting_pieces.append((square_bit.bit_length() - 1, piece))
+                    bitboard ^= square_bit
+
+        for square, piece in starting_pieces:
+            # The starting square is left empty once the piece jumps away from it
+            piece_occupied_mask = occupied_mask & ~(1 << square)
+            # Chains reaching a square in several orders continue alike, so the sequences from there are memoized on
+            # (square, captured mask, piece class)
+            memo = {}
+            for target, captured_squares in self.get_piece_captures(piece, square, occupied_mask, opponent_mask):
+                captured_mask = 0
+                for captured_square in captured_squares:
+                    captured_mask |= 1 << captured_square
+                for path, captured in self.continue_capture_sequence(memo, piece, target, captured_mask,
+                                                                     piece_occupied_mask, opponent_mask):
+                    sequences.append(((square,) + path, captured_squares + captured))
+        return sequences
+
+    def continue_capture_sequence(self, memo, piece, square, captured_mask, occupied_mask, opponent_mask):
+        """Return the (path, captured) ends of the capture sequences of a piece that has just jumped onto square"""
+        key = (square, captured_mask, piece)
+        sequences = memo.get(key)
+        if sequences is not None:
+            return sequences
+
+        board_occupied_mask = (occupied_mask & ~captured_mask) | (1 << square)
+        board_opponent_mask = opponent_mask & ~captured_mask
+        jumps = self.get_piece_captures(piece, square, board_occupied_mask, board_opponent_mask)
+        # As in make_move, a piece that can jump again before its promotion goes on as the promoted piece class
+        promoted_piece = PROMOTED_PIECES[piece][square]
+        if jumps and promoted_piece != piece:
+            jumps = self.get_piece_captures(promoted_piece, square, board_occupied_mask, board_opponent_mask)
+
+        if not jumps:
+            sequences = [((square,), ())]
+        else:
+            sequences = []
+            for target, captured_squares in jumps:
+                target_captured_mask = captured_mask
+                for captured_square in captured_squares:
+                    target_captured_mask |= 1 << captured_square
+                for path, captured in self.continue_capture_sequence(memo, promoted_piece, target,
+                                                                     target_captured_mask, occupied_mask,
+                                                                     opponent_mask):
+                    sequences.append(((square,) + path, captured_squares + captured))
+        memo[key] = sequences
+        return sequences
+
+    def get_piece_captures(self, piece, square, occupied_mask, opponent_mask):
+        """Return the (destination square, captured squares) index pairs of the capturing jumps of the piece class"""
+        if piece == BLACK_MAN or piece == WHITE_MAN:
+            captures = []
+            for direction in MAN_DIRECTIONS[piece // 3]:
+                ray = DIAGONAL_RAYS[square][direction]
+                if len(ray) > 1 and opponent_mask & (1 << ray[0]) and not occupied_mask & (1 << ray[1]):
+                    captures.append((ray[1], (ray[0],)))
+            return captures
+        if piece == BLACK_KING or piece == WHITE_KING:
+            return [(target, (captured_square,))
+                    for captured_square, target in self.get_king_captures(square, occupied_mask, opponent_mask)]
+        return [(target, captured_squares)
+                for captured_squares, target in self.get_triple_king_captures(square, occupied_mask, opponent_mask)]
+
+    def make_capture_sequence(self, path):
+        """Play a capture sequence path with make_move and return the undo record that unmake_move takes"""
+        record = self.make_move((path[0], path[1]))
+        for index in range(1, len(path) - 1):
+            self.make_move((path[index], path[index + 1]))
+        return record
+
+    def validate_out_of_turn(self, color_index, square_location, move_or_jump):
+        """Validate if the player of the color index attempts to move a piece out of turn"""
+        if self._trace_level >= TRACE_DEBUG:
+            self.trace(TRACE_DEBUG, "turn", player_turn=self._player_turn, piece_color=COLORS[color_index])
 
         # If this is not the player's turn
-        if self._player_turn != self._player[player_name].get_piece_color():
-            raise OutofTurn(f"This is not {player_name}'s turn.")
+        if self._player_turn != COLORS[color_index]:
+            raise OutofTurn(f"This is not {self._players[color_index].get_player_name()}'s turn.")
 
         # If the same player is attempting an action
-        if self._player[player_name] == self._prev_player:
+        if color_index == self._prev_color_index:
             # If previous is a jump, but currently is a move
             if self._prev_jump is True and move_or_jump == "move":
                 raise OutofTurn("Previously is a jump, this action cannot be a move.")
@@ -131,12 +573,10 @@ class Checkers:
                 raise OutofTurn("Cannot jump a different piece.")
 
     def validate_player_name(self, player_name):
-        """Validate if the player exists in the player dictionary,
+        """Validate if the player exists in the game,
         if exist return True, else raise an InvalidPlayer exception"""
-        if player_name in self._player:
-            return True
-        else:
-            raise InvalidPlayer("Player not found")
+        self.get_player_color_index(player_name)
+        return True
 
     def validate_square_location(self, square_location):
         """Validate if square location exist on the board,
@@ -146,19 +586,84 @@ class Checkers:
         else:
             raise InvalidSquare("Square location does not exist on the board.")
 
+    def get_piece_class(self, square):
+        """Return the piece class occupying the square index, or None if the square is empty"""
+        square_bit = 1 << square
+        for piece, bitboard in enumerate(self._bitboards):
+            if bitboard & square_bit:
+                return piece
+        return None
+
+    def get_piece_count(self, piece):
+        """Return the number of pieces of the piece class on the board"""
+        return self._piece_counts[piece]
+
+    def get_color_piece_count(self, color_index):
+        """Return the number of pieces of the color (0 for Black, 1 for White) on the board"""
+        piece_counts = self._piece_counts
+        base = color_index * 3
+        return piece_counts[base] + piece_counts[base + 1] + piece_counts[base + 2]
+
+    def get_material_score(self):
+        """Retrieve the material of Black minus the material of White"""
+        return self._material_score
+
+    def get_positional_score(self):
+        """Retrieve the positional value of Black's pieces minus the positional value of White's pieces"""
+        return self._positional_score
+
+    def evaluate(self):
+        """Return the material and positional score from the point of view of the side to move, kept up to
+        date by every method that changes the board"""
+        score = self._material_score + self._positional_score
+        if self._player_turn == "White":
+            return -score
+        return score
+
+    def compute_material(self):
+        """Count the pieces and compute the material and positional scores from scratch"""
+        self._piece_counts = [bitboard.bit_count() for bitboard in self._bitboards]
+        self._material_score = sum(SIGNED_PIECE_VALUES[piece] * count
+                                   for piece, count in enumerate(self._piece_counts))
+        self._positional_score = 0
+        for piece, bitboard in enumerate(self._bitboards):
+            while bitboard:
+                square_bit = bitboard & -bitboard
+                self._positional_score += SIGNED_PIECE_SQUARE_VALUES[piece][square_bit.bit_length() - 1]
+                bitboard ^= square_bit
+
+    def get_occupied_mask(self):
+        """Return the bitboard of every occupied square"""
+        bitboards = self._bitboards
+        return bitboards[0] | bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5]
+
+    def get_color_mask(self, color_index):
+        """Return the bitboard of every square occupied by the color (0 for Black, 1 for White)"""
+        bitboards = self._bitboards
+        base = color_index * 3
+        return bitboards[base] | bitboards[base + 1] | bitboards[base + 2]
+
+    def is_empty_square(self, square_location):
+        """Return True if the square location is a playable square with no piece on it"""
+        square = SQUARE_INDEX[square_location[0]][square_location[1]]
+        return square is not None and not self.get_occupied_mask() & (1 << square)
+
     def get_piece_symbol(self, square_location):
         """Return the piece symbol present in the square_location of the board"""
-        return self._board[square_location[0]][square_location[1]]
+        square = SQUARE_INDEX[square_location[0]][square_location[1]]
+        if square is None:
+            return None
+        piece = self.get_piece_class(square)
+        if piece is None:
+            return "   "
+        return PIECE_SYMBOLS[piece]
 
     def validate_square_location_ownership(self, start_piece, piece_color):
         """Validate the ownership of the starting and destination square location"""
-        black_pieces = [" B ", "B K", "BTK"]
-        white_pieces = [" W ", "W K", "WTK"]
+        piece = PIECE_CLASSES.get(start_piece)
 
         # Check is starting square location belongs to current player
-        if piece_color == "Black" and start_piece in black_pieces:
-            return True
-        elif piece_color == "White" and start_piece in white_pieces:
+        if piece is not None and piece // 3 == COLOR_INDEX.get(piece_color):
             return True
         else:
             raise InvalidSquare("Player does not own the piece on the starting square location.")
@@ -166,28 +671,19 @@ class Checkers:
     def get_checker_details(self, square_location):
         """Convert the symbol present in the square_location of the board into a readable format."""
         if 0 <= square_location[0] <= 7 and 0 <= square_location[1] <= 7:
-            square = self._board[square_location[0]][square_location[1]]
-            if square == "   ":
+            square = SQUARE_INDEX[square_location[0]][square_location[1]]
+            if square is None:
                 return None
-            elif square == " B ":
-                return "Black"
-            elif square == " W ":
-                return "White"
-            elif square == "B K":
-                return "Black_king"
-            elif square == "W K":
-                return "White_king"
-            elif square == "BTK":
-                return "Black_Triple_King"
-            elif square == "WTK":
-                return "White_Triple_King"
-            else:
+            piece = self.get_piece_class(square)
+            if piece is None:
                 return None
+            return CHECKER_DETAILS[piece]
         else:
             raise InvalidSquare("Square location does not exist on the board.")
 
     def validate_move(self, starting_sq_loc, destination_sq_loc, checker_piece):
         """Validate if the piece move is valid"""
+        piece = PIECE_CLASSES.get(checker_piece)
         horizontal_flag = False
         vertical_flag = False
 
@@ -196,22 +692,24 @@ class Checkers:
             horizontal_flag = True
 
         # For Black piece, -1 vertical moves are allowed
-        if checker_piece == " B ":
+        if piece == BLACK_MAN:
             if destination_sq_loc[0] == starting_sq_loc[0] - 1:
                 vertical_flag = True
         # For White piece, +1 vertical moves are allowed
-        elif checker_piece == " W ":
+        elif piece == WHITE_MAN:
             if destination_sq_loc[0] == starting_sq_loc[0] + 1:
                 vertical_flag = True
 
-        elif checker_piece == "B K" or checker_piece == "BTK" or checker_piece == "W K" or checker_piece == "WTK":
+        elif piece is not None:
             if destination_sq_loc[0] == starting_sq_loc[0] - 1 or destination_sq_loc[0] == starting_sq_loc[0] + 1:
                 vertical_flag = True
 
-        return horizontal_flag and vertical_flag
+        # The destination square location has to be empty
+        return horizontal_flag and vertical_flag and self.is_empty_square(destination_sq_loc)
 
     def validate_regular_jump(self, starting_sq_loc, destination_sq_loc, checker_piece):
         """Validate if the regular piece jump is valid"""
+        piece = PIECE_CLASSES.get(checker_piece)
         horizontal_flag = False
         vertical_flag = False
 
@@ -219,554 +717,291 @@ class Checkers:
         if destination_sq_loc[1] == starting_sq_loc[1] + 2 or destination_sq_loc[1] == starting_sq_loc[1] - 2:
             horizontal_flag = True
         # For Black checker, -2 vertical moves are allowed
-        if checker_piece == " B ":
+        if piece == BLACK_MAN:
             if destination_sq_loc[0] == starting_sq_loc[0] - 2:
                 vertical_flag = True
         # For White checker, +2 vertical moves are allowed
-        elif checker_piece == " W ":
+        elif piece == WHITE_MAN:
             if destination_sq_loc[0] == starting_sq_loc[0] + 2:
                 vertical_flag = True
 
-        return horizontal_flag and vertical_flag
+        if not (horizontal_flag and vertical_flag and self.is_empty_square(destination_sq_loc)):
+            return False
+
+        # The jumped square location has to hold an opponent piece
+        mid_square = SQUARE_INDEX[(destination_sq_loc[0] + starting_sq_loc[0]) // 2][
+            (destination_sq_loc[1] + starting_sq_loc[1]) // 2]
+        return bool(self.get_color_mask(1 - piece // 3) & (1 << mid_square))
+
+    def get_diagonal_squares(self, starting_sq_loc, destination_sq_loc):
+        """Return the square indices strictly in between two square locations on the same diagonal,
+        or None if the two square locations do not share a diagonal"""
+        row_diff = destination_sq_loc[0] - starting_sq_loc[0]
+        col_diff = destination_sq_loc[1] - starting_sq_loc[1]
+        if row_diff == 0 or (row_diff != col_diff and row_diff != -col_diff):
+            return None
+
+        # Slice the precomputed ray of the jump direction up to the destination
+        direction = (DOWN_LEFT if row_diff > 0 else UP_LEFT) + (1 if col_diff > 0 else 0)
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        return DIAGONAL_RAYS[start_square][direction][:abs(row_diff) - 1]
+
+    def get_capture_count(self, color_index, starting_sq_loc, destination_sq_loc):
+        """Return the number of pieces of the opponent of the color index in between two square locations on
+        the same diagonal"""
+        opponent_mask = self.get_color_mask(1 - color_index)
+        return sum(1 for square in self.get_diagonal_squares(starting_sq_loc, destination_sq_loc)
+                   if opponent_mask & (1 << square))
 
     def validate_king_jump(self, starting_sq_loc, destination_sq_loc, checker_piece):
         """Validate if the king piece jump is valid"""
-        if checker_piece == "B K" or checker_piece == "W K":
-            np_board = np.array(self._board)
-            x, y = starting_sq_loc
-            start_pos = None
-            des_pos = None
-            capture_count = 0
-
-            # Set the destination square location to " D " as placeholder for the list search operation
-            self._board[destination_sq_loc[0]][destination_sq_loc[1]] = " D "
-
-            # Find the diagonal list from top left and top right
-            diagonal_list_from_top_left = np.diagonal(np_board, offset=(y - x))
-            print(diagonal_list_from_top_left)
-            diagonal_list_from_top_right = np.diagonal(np.rot90(np_board), offset=-np_board.shape[0] + (y + x) + 1)
-            print(diagonal_list_from_top_right)
-
-            # If jumping from top left to bottom right
-            if starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-                diagonal_list = diagonal_list_from_top_left
-            # If jumping from top right to bottom left
-            elif starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-                diagonal_list = diagonal_list_from_top_right
-            # If jumping from bottom left to top right
-            elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-                diagonal_list = np.flip(diagonal_list_from_top_right)
-            # If jumping from bottom right to top left
-            elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-                diagonal_list = np.flip(diagonal_list_from_top_left)
-            else:
-                raise InvalidSquare
-
-            print(f"decided diagonal list: {diagonal_list}")
-
-            # Locate the index of the player's piece and destination square location
-            for index, piece in enumerate(diagonal_list):
-                if piece == checker_piece:
-                    start_pos = index
-                if piece == " D ":
-                    des_pos = index
-
-            print(f"From: {start_pos}")
-            print(f"To: {des_pos}")
-
-            # Slice the diagonal list to include just the square locations in between player's piece and destination
-            diagonal_list = diagonal_list[start_pos + 1:des_pos]
-            print(f"new diagonal list: {diagonal_list}")
-
-            # Count the number of opponent pieces that the player jumped
-            if checker_piece == "B K":
-                for piece in diagonal_list:
-                    if piece == " W " or piece == "W K" or piece == "WTK":
-                        capture_count += 1
+        piece = PIECE_CLASSES.get(checker_piece)
+        if piece != BLACK_KING and piece != WHITE_KING:
+            return False
 
-            elif checker_piece == "W K":
-                for piece in diagonal_list:
-                    if piece == " B " or piece == "B K" or piece == "BTK":
-                        capture_count += 1
+        # Find the square locations in between the player's piece and the destination
+        diagonal_squares = self.get_diagonal_squares(starting_sq_loc, destination_sq_loc)
+        if not diagonal_squares or not self.is_empty_square(destination_sq_loc):
+            return False
 
-            # Reset " D " placeholder
-            self._board[destination_sq_loc[0]][destination_sq_loc[1]] = "   "
+        # Count the number of opponent pieces that the player jumped
+        opponent_mask = self.get_color_mask(1 - piece // 3)
+        capture_count = 0
+        for square in diagonal_squares:
+            if opponent_mask & (1 << square):
+                capture_count += 1
 
-            print(capture_count)
-            if capture_count == 1:
-                return True
+        return capture_count == 1
 
     def validate_triple_king_jump(self, starting_sq_loc, destination_sq_loc, checker_piece):
         """Validate if the triple king piece jump is valid"""
-        if checker_piece == "BTK" or checker_piece == "WTK":
-            np_board = np.array(self._board)
-            x, y = starting_sq_loc
-            start_pos = None
-            des_pos = None
-            capture_count = 0
+        piece = PIECE_CLASSES.get(checker_piece)
+        if piece != BLACK_TRIPLE_KING and piece != WHITE_TRIPLE_KING:
+            return False
 
-            # Set the destination square location to " D " as placeholder for the list search operation
-            self._board[destination_sq_loc[0]][destination_sq_loc[1]] = " D "
-
-            # Find the diagonal list from top left and top right
-            diagonal_list_from_top_left = np.diagonal(np_board, offset=(y - x))
-            print(diagonal_list_from_top_left)
-            diagonal_list_from_top_right = np.diagonal(np.rot90(np_board), offset=-np_board.shape[0] + (y + x) + 1)
-            print(diagonal_list_from_top_right)
-
-            # If jumping from top left to bottom right
-            if starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-                diagonal_list = diagonal_list_from_top_left
-            # If jumping from top right to bottom left
-            elif starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-                diagonal_list = diagonal_list_from_top_right
-            # If jumping from bottom left to top right
-            elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-                diagonal_list = np.flip(diagonal_list_from_top_right)
-            # If jumping from bottom right to top left
-            elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-                diagonal_list = np.flip(diagonal_list_from_top_left)
-            else:
-                raise InvalidSquare
-
-            print(f"decided diagonal list: {diagonal_list}")
-
-            # Locate the index of the player's piece and destination square location
-            for index, piece in enumerate(diagonal_list):
-                if piece == checker_piece:
-                    start_pos = index
-                if piece == " D ":
-                    des_pos = index
-
-            print(f"From: {start_pos}")
-            print(f"To: {des_pos}")
-
-            # Slice the diagonal list to include just the square locations in between player's piece and destination
-            diagonal_list = diagonal_list[start_pos + 1:des_pos]
-            print(f"new diagonal list: {diagonal_list}")
-
-            # Count the number of opponent pieces that the player jumped
-            if checker_piece == "BTK":
-                for piece in diagonal_list:
-                    if piece == " W " or piece == "W K" or piece == "WTK":
-                        capture_count += 1
+        # Find the square locations in between the player's piece and the destination
+        diagonal_squares = self.get_diagonal_squares(starting_sq_loc, destination_sq_loc)
+        if not diagonal_squares or not self.is_empty_square(destination_sq_loc):
+            return False
 
-            elif checker_piece == "WTK":
-                for piece in diagonal_list:
-                    if piece == " B " or piece == "B K" or piece == "BTK":
-                        capture_count += 1
+        # Count the number of opponent pieces that the player jumped
+        opponent_mask = self.get_color_mask(1 - piece // 3)
+        capture_count = 0
+        for square in diagonal_squares:
+            if opponent_mask & (1 << square):
+                capture_count += 1
+
+        # Triple king can either jump friendly piece, or jump 1 or 2 opponent pieces
+        return capture_count <= 2
+
+    def capture_piece(self, color_index, square):
+        """Remove the opponent piece on the square index and keep track of the captured pieces count of the
+        player of the color index"""
+        captured_piece = self.get_piece_class(square)
+        self._bitboards[captured_piece] &= ~(1 << square)
+        self._hash ^= ZOBRIST_PIECE_KEYS[captured_piece][square]
+        self._piece_counts[captured_piece] -= 1
+        self._material_score -= SIGNED_PIECE_VALUES[captured_piece]
+        self._positional_score -= SIGNED_PIECE_SQUARE_VALUES[captured_piece][square]
+
+        # Increment the player's captured pieces count
+        self._players[color_index].increment_captured_pieces_count(1)
 
-            # Triple king can either jump friendly piece, or jump 1 or 2 opponent pieces
-            if 0 <= capture_count <= 2:
-                return True
+        # Decrement the opponent's king or triple king piece (if any)
+        if captured_piece == BLACK_KING or captured_piece == WHITE_KING:
+            self._players[1 - color_index].decrement_king_count()
+        elif captured_piece == BLACK_TRIPLE_KING or captured_piece == WHITE_TRIPLE_KING:
+            self._players[1 - color_index].decrement_triple_king_count()
 
     def set_move(self, starting_sq_loc, destination_sq_loc, checker_piece):
         """Move the checker"""
-        self._board[starting_sq_loc[0]][starting_sq_loc[1]] = "   "
-        self._board[destination_sq_loc[0]][destination_sq_loc[1]] = checker_piece
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        destination_square = SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]]
+        piece = PIECE_CLASSES[checker_piece]
+        self._bitboards[piece] ^= (1 << start_square) | (1 << destination_square)
+        self._hash ^= ZOBRIST_PIECE_KEYS[piece][start_square] ^ ZOBRIST_PIECE_KEYS[piece][destination_square]
+        self._positional_score += (SIGNED_PIECE_SQUARE_VALUES[piece][destination_square]
+                                   - SIGNED_PIECE_SQUARE_VALUES[piece][start_square])
+        self.set_hash_continuation(None)
 
         self._prev_move = True
         self._prev_jump = False
 
-    def set_regular_jump(self, player_name, opponent_player_name, starting_sq_loc, destination_sq_loc, checker_piece):
+    def set_regular_jump(self, color_index, starting_sq_loc, destination_sq_loc, checker_piece):
         """Jump the regular checker and keep track of the captured opponent pieces count during the jump"""
 
-        # Set initial location to blank and new location to checker
-        self._board[starting_sq_loc[0]][starting_sq_loc[1]] = "   "
-        self._board[destination_sq_loc[0]][destination_sq_loc[1]] = checker_piece
-
-        # Find the coordinate of the piece in between the jump
-        mid_piece_x_coord = int((destination_sq_loc[0] + starting_sq_loc[0]) / 2)
-        mid_piece_y_coord = int((destination_sq_loc[1] + starting_sq_loc[1]) / 2)
-
-        # Set that piece to blank
-        captured_piece = self._board[mid_piece_x_coord][mid_piece_y_coord]
-        self._board[mid_piece_x_coord][mid_piece_y_coord] = "   "
-
-        # Increment the player's piece
-        self._player[player_name].increment_captured_pieces_count(1)
-
-        # Decrement the opponent's king or triple king piece (if any)
-        if self._player[player_name].get_piece_color() == "Black":
-            if captured_piece == "W K":
-                self._player[opponent_player_name].decrement_king_count()
-            elif captured_piece == "WTK":
-                self._player[opponent_player_name].decrement_triple_king_count()
-        elif self._player[player_name].get_piece_color() == "White":
-            if captured_piece == "B K":
-                self._player[opponent_player_name].decrement_king_count()
-            elif captured_piece == "BTK":
-                self._player[opponent_player_name].decrement_triple_king_count()
+        # Clear the initial location and set the new location to checker
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        destination_square = SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]]
+        piece = PIECE_CLASSES[checker_piece]
+        self._bitboards[piece] ^= (1 << start_square) | (1 << destination_square)
+        self._hash ^= ZOBRIST_PIECE_KEYS[piece][start_square] ^ ZOBRIST_PIECE_KEYS[piece][destination_square]
+        self._positional_score += (SIGNED_PIECE_SQUARE_VALUES[piece][destination_square]
+                                   - SIGNED_PIECE_SQUARE_VALUES[piece][start_square])
+        self.set_hash_continuation(destination_square)
+
+        # Find the square of the piece in between the jump and capture it
+        mid_square = SQUARE_INDEX[(destination_sq_loc[0] + starting_sq_loc[0]) // 2][
+            (destination_sq_loc[1] + starting_sq_loc[1]) // 2]
+        self.capture_piece(color_index, mid_square)
 
         self._prev_piece_coord = destination_sq_loc
         self._prev_move = False
         self._prev_jump = True
 
-    def set_king_jump(self, player_name, opponent_player_name, starting_sq_loc, destination_sq_loc, checker_piece):
+    def set_king_jump(self, color_index, starting_sq_loc, destination_sq_loc, checker_piece):
         """Jump the king checker and keep track of the captured opponent pieces count during the jump"""
-        black_pieces = [" B ", "B K", "BTK"]
-        white_pieces = [" W ", "W K", "WTK"]
-        x_coord_arr, y_coord_arr = [], []
+        piece = PIECE_CLASSES[checker_piece]
+        diagonal_squares = self.get_diagonal_squares(starting_sq_loc, destination_sq_loc)
+        if diagonal_squares is None:
+            raise InvalidSquare("The square location the player is jumping to is not valid")
 
-        # Set initial location to blank and new location to checker
-        self._board[starting_sq_loc[0]][starting_sq_loc[1]] = "   "
-        self._board[destination_sq_loc[0]][destination_sq_loc[1]] = checker_piece
+        # Clear the initial location and set the new location to checker
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        destination_square = SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]]
+        self._bitboards[piece] ^= (1 << start_square) | (1 << destination_square)
+        self._hash ^= ZOBRIST_PIECE_KEYS[piece][start_square] ^ ZOBRIST_PIECE_KEYS[piece][destination_square]
+        self._positional_score += (SIGNED_PIECE_SQUARE_VALUES[piece][destination_square]
+                                   - SIGNED_PIECE_SQUARE_VALUES[piece][start_square])
+        self.set_hash_continuation(destination_square)
 
         # If a checker within the diagonal line of jump is an opponent checker, capture it
-        # If the jump is from top left to bottom right
-        if starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] + 1
-            x_coord = starting_sq_loc[1] + 1
-
-            while starting_sq_loc[0] < y_coord < destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord += 1
-            while starting_sq_loc[1] < x_coord < destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord += 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from top right to bottom left
-        elif starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] + 1
-            x_coord = starting_sq_loc[1] - 1
-
-            while starting_sq_loc[0] < y_coord < destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord += 1
-            while starting_sq_loc[1] > x_coord > destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord -= 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from bottom left to top right
-        elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] - 1
-            x_coord = starting_sq_loc[1] + 1
-
-            while starting_sq_loc[0] > y_coord > destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord -= 1
-            while starting_sq_loc[1] < x_coord < destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord += 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from bottom right to top left
-        elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] - 1
-            x_coord = starting_sq_loc[1] - 1
-
-            while starting_sq_loc[0] > y_coord > destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord -= 1
-            while starting_sq_loc[1] > x_coord > destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord -= 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        else:
-            raise InvalidSquare("The square location the player is jumping to is not valid")
-
-        # Decrement opponent's king/triple king piece (if any), capturing opponent pieces, increment captured count
-        if checker_piece == "B K":
-            for coord in range(len(y_coord_arr)):
-                if self._board[y_coord_arr[coord]][x_coord_arr[coord]] in white_pieces:
-                    if self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "W K":
-                        self._player[opponent_player_name].decrement_king_count()
-                    elif self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "WTK":
-                        self._player[opponent_player_name].decrement_triple_king_count()
-
-                    self._board[y_coord_arr[coord]][x_coord_arr[coord]] = "   "
-                    self._player[player_name].increment_captured_pieces_count(1)
-
-        elif checker_piece == "W K":
-            for coord in range(len(y_coord_arr)):
-                if self._board[y_coord_arr[coord]][x_coord_arr[coord]] in black_pieces:
-                    if self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "B K":
-                        self._player[opponent_player_name].decrement_king_count()
-                    elif self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "BTK":
-                        self._player[opponent_player_name].decrement_triple_king_count()
-
-                    self._board[y_coord_arr[coord]][x_coord_arr[coord]] = "   "
-                    self._player[player_name].increment_captured_pieces_count(1)
+        opponent_mask = self.get_color_mask(1 - piece // 3)
+        for square in diagonal_squares:
+            if opponent_mask & (1 << square):
+                self.capture_piece(color_index, square)
 
         self._prev_piece_coord = destination_sq_loc
         self._prev_move = False
         self._prev_jump = True
 
-    def set_triple_king_jump(self, player_name, opponent_player_name, starting_sq_loc, destination_sq_loc, checker_piece):
-        """Jump the triple king checker and keep track of the captured opponent pieces count during the jump"""
-        black_pieces = [" B ", "B K", "BTK"]
-        white_pieces = [" W ", "W K", "WTK"]
-        x_coord_arr, y_coord_arr = [], []
-
-        # Set initial location to blank and new location to checker
-        self._board[starting_sq_loc[0]][starting_sq_loc[1]] = "   "
-        self._board[destination_sq_loc[0]][destination_sq_loc[1]] = checker_piece
-
-        # If a checker within the diagonal line of jump is an opponent checker, capture it
-        # If the jump is from top left to bottom right
-        if starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] + 1
-            x_coord = starting_sq_loc[1] + 1
-
-            while starting_sq_loc[0] < y_coord < destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord += 1
-            while starting_sq_loc[1] < x_coord < destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord += 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from top right to bottom left
-        elif starting_sq_loc[0] < destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] + 1
-            x_coord = starting_sq_loc[1] - 1
-
-            while starting_sq_loc[0] < y_coord < destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord += 1
-            while starting_sq_loc[1] > x_coord > destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord -= 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from bottom left to top right
-        elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] < destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] - 1
-            x_coord = starting_sq_loc[1] + 1
-
-            while starting_sq_loc[0] > y_coord > destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord -= 1
-            while starting_sq_loc[1] < x_coord < destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord += 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        # If the jump is from bottom right to top left
-        elif starting_sq_loc[0] > destination_sq_loc[0] and starting_sq_loc[1] > destination_sq_loc[1]:
-            # increment x/y coord to the next square location diagonally
-            y_coord = starting_sq_loc[0] - 1
-            x_coord = starting_sq_loc[1] - 1
-
-            while starting_sq_loc[0] > y_coord > destination_sq_loc[0]:
-                print(y_coord)
-                y_coord_arr.append(y_coord)
-                y_coord -= 1
-            while starting_sq_loc[1] > x_coord > destination_sq_loc[1]:
-                print(x_coord)
-                x_coord_arr.append(x_coord)
-                x_coord -= 1
-
-            print((y_coord_arr, x_coord_arr))
-
-        else:
+    def set_triple_king_jump(self, color_index, starting_sq_loc, destination_sq_loc, checker_piece):
+        """Jump the triple king checker and keep track of the captured opponent pieces count during the jump,
+        return the number of opponent pieces captured"""
+        piece = PIECE_CLASSES[checker_piece]
+        diagonal_squares = self.get_diagonal_squares(starting_sq_loc, destination_sq_loc)
+        if diagonal_squares is None:
             raise InvalidSquare("The square location the player is jumping to is not valid")
 
-        # Capturing opponent pieces
-        if checker_piece == "BTK":
-            for coord in range(len(y_coord_arr)):
-                if self._board[y_coord_arr[coord]][x_coord_arr[coord]] in white_pieces:
-                    if self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "W K":
-                        self._player[opponent_player_name].decrement_king_count()
-                    elif self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "WTK":
-                        self._player[opponent_player_name].decrement_triple_king_count()
-
-                    self._board[y_coord_arr[coord]][x_coord_arr[coord]] = "   "
-                    self._player[player_name].increment_captured_pieces_count(1)
-
-        elif checker_piece == "WTK":
-            for coord in range(len(y_coord_arr)):
-                if self._board[y_coord_arr[coord]][x_coord_arr[coord]] in black_pieces:
-                    if self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "B K":
-                        self._player[opponent_player_name].decrement_king_count()
-                    elif self._board[y_coord_arr[coord]][x_coord_arr[coord]] == "BTK":
-                        self._player[opponent_player_name].decrement_triple_king_count()
-
-                    self._board[y_coord_arr[coord]][x_coord_arr[coord]] = "   "
-                    self._player[player_name].increment_captured_pieces_count(1)
+        # Clear the initial location and set the new location to checker
+        start_square = SQUARE_INDEX[starting_sq_loc[0]][starting_sq_loc[1]]
+        destination_square = SQUARE_INDEX[destination_sq_loc[0]][destination_sq_loc[1]]
+        self._bitboards[piece] ^= (1 << start_square) | (1 << destination_square)
+        self._hash ^= ZOBRIST_PIECE_KEYS[piece][start_square] ^ ZOBRIST_PIECE_KEYS[piece][destination_square]
+        self._positional_score += (SIGNED_PIECE_SQUARE_VALUES[piece][destination_square]
+                                   - SIGNED_PIECE_SQUARE_VALUES[piece][start_square])
+        self.set_hash_continuation(destination_square)
+
+        # Capturing opponent pieces, friendly pieces that were jumped stay on the board
+        opponent_mask = self.get_color_mask(1 - piece // 3)
+        capture_count = 0
+        for square in diagonal_squares:
+            if opponent_mask & (1 << square):
+                self.capture_piece(color_index, square)
+                capture_count += 1
 
         self._prev_piece_coord = destination_sq_loc
         self._prev_move = False
         self._prev_jump = True
+        return capture_count
 
     def validate_regular_jump_opportunity(self, current_sq_loc, checker_piece):
         """Validate if the regular checker has the opportunity to jump an opponent's checker"""
-        black_pieces = [" B ", "B K", "BTK"]
-        white_pieces = [" W ", "W K", "WTK"]
-
-        # print(self._prev_piece_coord)
-        # print(checker_symbol)
-        # if self._prev_piece_coord == current_sq_loc:
+        piece = PIECE_CLASSES.get(checker_piece)
+        if piece == BLACK_MAN:
+            row_step = -1
+        elif piece == WHITE_MAN:
+            row_step = 1
+        else:
+            return False
 
-        print(f"current location: {current_sq_loc}")
+        occupied_mask = self.get_occupied_mask()
+        opponent_mask = self.get_color_mask(1 - piece // 3)
+        row, col = current_sq_loc
 
         # If a diagonal square location is an opponent piece and the square location after is blank
-        if checker_piece == " B ":
-            if 0 <= current_sq_loc[0] - 2 <= 7 and 0 <= current_sq_loc[1] - 2 <= 7:
-                if self._board[current_sq_loc[0] - 2][current_sq_loc[1] - 2] == "   " and self._board[current_sq_loc[0] - 1][current_sq_loc[1] - 1] in white_pieces:
-                    return True
-            if 0 <= current_sq_loc[0] - 2 <= 7 and 0 <= current_sq_loc[1] + 2 <= 7:
-                if self._board[current_sq_loc[0] - 2][current_sq_loc[1] + 2 == "   " and self._board[current_sq_loc[0] - 1][current_sq_loc[1] + 1] in white_pieces]:
-                    return True
-
-        elif checker_piece == " W ":
-            if 0 <= current_sq_loc[0] + 2 <= 7 and 0 <= current_sq_loc[1] - 2 <= 7:
-                if self._board[current_sq_loc[0] + 2][current_sq_loc[1] - 2] == "   " and self._board[current_sq_loc[0] + 1][current_sq_loc[1] - 1] in black_pieces:
-                    return True
-            if 0 <= current_sq_loc[0] + 2 <= 7 and 0 <= current_sq_loc[1] + 2 <= 7:
-                if self._board[current_sq_loc[0] + 2][current_sq_loc[1] + 2] == "   " and self._board[current_sq_loc[0] + 1][current_sq_loc[1] + 1] in black_pieces:
-                    return True
+        if 0 <= row + 2 * row_step <= 7:
+            for col_step in (-1, 1):
+                if 0 <= col + 2 * col_step <= 7:
+                    mid_square = SQUARE_INDEX[row + row_step][col + col_step]
+                    landing_square = SQUARE_INDEX[row + 2 * row_step][col + 2 * col_step]
+                    if opponent_mask & (1 << mid_square) and not occupied_mask & (1 << landing_square):
+                        return True
+        return False
 
     def validate_king_jump_opportunity(self, current_sq_loc, checker_piece):
-        """Validate if the king checker has the opportunity to jump an opponent's checker"""
-        black_pieces = [" B ", "B K", "BTK"]
-        white_pieces = [" W ", "W K", "WTK"]
-
-        more_jump = False
-
-        np_board = np.array(self._board)
-        x, y = current_sq_loc
-
-        # Find the diagonal list from top left and top right
-        diagonal_list_from_top_left = np.diagonal(np_board, offset=(y - x))
-        print(diagonal_list_from_top_left)
-        diagonal_list_from_top_right = np.diagonal(np.rot90(np_board), offset=-np_board.shape[0] + (y + x) + 1)
-        print(diagonal_list_from_top_right)
-
-        diagonal_list_to_bottom_right = []
-        diagonal_list_to_bottom_left = []
-        diagonal_list_to_top_right = []
-        diagonal_list_to_top_left = []
-
-        # Find list from current square location to bottom right
-        for index, piece in enumerate(diagonal_list_from_top_left):
-            if piece == checker_piece:
-                diagonal_list_to_bottom_right = diagonal_list_from_top_left[index:].tolist()
-
-        # Find list from current square location to bottom left
-        for index, piece in enumerate(diagonal_list_from_top_right):
-            if piece == checker_piece:
-                diagonal_list_to_bottom_left = diagonal_list_from_top_right[index:].tolist()
-
-        # Find list from current square location to top right
-        for index, piece in enumerate(np.flip(diagonal_list_from_top_right)):
-            if piece == checker_piece:
-                diagonal_list_to_top_right = np.flip(diagonal_list_from_top_right)[index:].tolist()
-
-        # Find list from current square location to top right
-        for index, piece in enumerate(np.flip(diagonal_list_from_top_left)):
-            if piece == checker_piece:
-                diagonal_list_to_top_left = np.flip(diagonal_list_from_top_left)[index:].tolist()
-
-        # Change all opponent pieces to " O "
-        if checker_piece == "B K":
-            for index, square in enumerate(diagonal_list_to_bottom_right):
-                if square == " W " or square == "W K" or square == "WTK":
-                    diagonal_list_to_bottom_right[index] = " O "
-            for index, square in enumerate(diagonal_list_to_bottom_left):
-                if square == " W " or square == "W K" or square == "WTK":
-                    diagonal_list_to_bottom_left[index] = " O "
-            for index, square in enumerate(diagonal_list_to_top_right):
-                if square == " W " or square == "W K" or square == "WTK":
-                    diagonal_list_to_top_right[index] = " O "
-            for index, square in enumerate(diagonal_list_to_top_left):
-                if square == " W " or square == "W K" or square == "WTK":
-                    diagonal_list_to_top_left[index] = " O "
-
-        elif checker_piece == "W K":
-            for index, square in enumerate(diagonal_list_to_bottom_right):
-                if square == " B " or square == "B K" or square == "BTK":
-                    diagonal_list_to_bottom_right[index] = " O "
-            for index, square in enumerate(diagonal_list_to_bottom_left):
-                if square == " B " or square == "B K" or square == "BTK":
-                    diagonal_list_to_bottom_left[index] = " O "
-            for index, square in enumerate(diagonal_list_to_top_right):
-                if square == " B " or square == "B K" or square == "BTK":
-                    diagonal_list_to_top_right[index] = " O "
-            for index, square in enumerate(diagonal_list_to_top_left):
-                if square == " B " or square == "B K" or square == "BTK":
-                    diagonal_list_to_top_left[index] = " O "
-
-        print("++++++++++++++++++")
-        print(diagonal_list_to_bottom_right)
-        print(diagonal_list_to_bottom_left)
-        print(diagonal_list_to_top_right)
-        print(diagonal_list_to_top_left)
-        print("++++++++++++++++++")
-
-        # Method to compare the valid jump sequence to the diagonal list,
-        # if the valid jump sequence is subsequence of diagonal list, then the jump is valid
-        def rec_is_valid_jump(valid_jump_seq, diagonal_list, seq_to_compare, pos1, pos2):
-            if pos1 >= len(valid_jump_seq) or pos2 >= len(diagonal_list):  # base case: if pos1/pos2 index out of range
-                if seq_to_compare == valid_jump_seq:  # then do the comparison
-                    return True
-                else:
-                    return False
-
-            if valid_jump_seq[pos1] == diagonal_list[pos2]:  # if str1 in index [pos1] equals str2 in index [pos2]
-                seq_to_compare.append(diagonal_list[pos2])  # append the character to str_to_compare
-                pos1 += 1  # increment index for str1
-
-            pos2 += 1  # increment index for str2 (regardless of matching)
-            return rec_is_valid_jump(valid_jump_seq, diagonal_list, seq_to_compare, pos1, pos2)
-
-        def is_valid_jump(valid_jump_seq, diagonal_list):
-            """Helper method to initialize seq_to_compare, pos1, pos2"""
-            return rec_is_valid_jump(valid_jump_seq, diagonal_list, [], 0, 0)
-
-        all_diagonal_lists = [diagonal_list_to_bottom_right, diagonal_list_to_bottom_left, diagonal_list_to_top_right,
-                              diagonal_list_to_top_left]
-
-        # Declare all possible valid jump sequences, and check recursively if any diagonal lists have matching sequences
-        valid_jump_seqs = [["   ", " O ", "   "], [" O ", "   "]]  # O is opponent piece
-        for valid_jump_seq in valid_jump_seqs:
-            for diagonal_list in all_diagonal_lists:
-                if is_valid_jump(valid_jump_seq, diagonal_list):
-                    print("OKKKKKKKKK")
-                    return True
+        """Return the (captured square location, destination square location) pairs of every jump the king checker
+        can make from its square location, an empty list if it has none or the piece is not a king"""
+        piece = PIECE_CLASSES.get(checker_piece)
+        if piece != BLACK_KING and piece != WHITE_KING:
+            return []
+
+        captures = self.get_king_captures(SQUARE_INDEX[current_sq_loc[0]][current_sq_loc[1]],
+                                          self.get_occupied_mask(), self.get_color_mask(1 - piece // 3))
+        jump_targets = [(SQUARE_COORD[captured_square], SQUARE_COORD[target])
+                        for captured_square, target in captures]
+        if jump_targets and self._trace_level >= TRACE_DEBUG:
+            self.trace(TRACE_DEBUG, "king_jump_opportunity", square=current_sq_loc, targets=jump_targets)
+        return jump_targets
+
+    def get_king_captures(self, square, occupied_mask, opponent_mask, first_only=False):
+        """Return the (captured square, destination square) index pairs of every king jump, one per empty landing
+        square before a second opponent piece, where the old matcher only answered whether a jump exists"""
+        captures = []
+        for ray in DIAGONAL_RAYS[square]:
+            captured_square = None
+            for target in ray:
+                target_bit = 1 << target
+                if opponent_mask & target_bit:
+                    if captured_square is not None:
+                        break
+                    captured_square = target
+                elif captured_square is not None and not occupied_mask & target_bit:
+                    captures.append((captured_square, target))
+                    if first_only:
+                        return captures
+        return captures
 
     def validate_triple_king_jump_opportunity(self, current_sq_loc, checker_piece):
-        """Validate if the triple king checker has the opportunity to jump an opponent's checker"""
-        # for x_coord in range
-        pass
-
-    def flip_turn(self, player_name):
-        """Flip the turn to the opponent player"""
-        if self._player[player_name].get_piece_color() == "Black":
-            self._player_turn = "White"
-        elif self._player[player_name].get_piece_color() == "White":
-            self._player_turn = "Black"
+        """Return the (captured square locations, destination square location) pairs of the triple king's jumps"""
+        piece = PIECE_CLASSES.get(checker_piece)
+        if piece != BLACK_TRIPLE_KING and piece != WHITE_TRIPLE_KING:
+            return []
+
+        captures = self.get_triple_king_captures(SQUARE_INDEX[current_sq_loc[0]][current_sq_loc[1]],
+                                                 self.get_occupied_mask(), self.get_color_mask(1 - piece // 3))
+        jump_targets = [(tuple(SQUARE_COORD[square] for square in captured_squares), SQUARE_COORD[target])
+                        for captured_squares, target in captures]
+        if jump_targets and self._trace_level >= TRACE_DEBUG:
+            self.trace(TRACE_DEBUG, "triple_king_jump_opportunity", square=current_sq_loc, targets=jump_targets)
+        return jump_targets
+
+    def get_triple_king_captures(self, square, occupied_mask, opponent_mask, first_only=False):
+        """Return the (captured squares, destination square) index pairs of every capturing triple king jump"""
+        captures = []
+        for ray in DIAGONAL_RAYS[square]:
+            captured_squares = ()
+            for target in ray:
+                target_bit = 1 << target
+                if opponent_mask & target_bit:
+                    if len(captured_squares) == 2:
+                        break
+                    captured_squares += (target,)
+                elif captured_squares and not occupied_mask & target_bit:
+                    captures.append((captured_squares, target))
+                    if first_only:
+                        return captures
+        return captures
+
+    def flip_turn(self, color_index):
+        """Flip the turn to the opponent of the player of the color index"""
+        player_turn = self._player_turn
+        self._player_turn = COLORS[1 - color_index]
+
+        # The turn changing hands ends any jump continuation
+        if self._player_turn != player_turn:
+            self._hash ^= ZOBRIST_TURN_KEY
+        self.set_hash_continuation(None)
 
     def validate_regular_promotion(self, square_location, checker_piece):
         """Validate if a regular checker has reached the end of opponent's side and can be promoted to king"""
@@ -782,51 +1017,238 @@ class Checkers:
         elif checker_piece == "W K" and square_location[0] == 0:
             return True
 
-    def promote_regular_piece(self, player_name, square_location):
+    def promote_piece(self, color_index, square_location):
+        """Promote the piece on the square location if it has reached the end of the board"""
+        piece = self.get_piece_class(SQUARE_INDEX[square_location[0]][square_location[1]])
+        if piece == BLACK_MAN or piece == WHITE_MAN:
+            if self.validate_regular_promotion(square_location, PIECE_SYMBOLS[piece]):
+                self.promote_regular_piece(color_index, square_location)
+        elif piece == BLACK_KING or piece == WHITE_KING:
+            if self.validate_king_promotion(square_location, PIECE_SYMBOLS[piece]):
+                self.promote_king_piece(color_index, square_location)
+
+    def replace_piece(self, square, old_piece, new_piece):
+        """Replace the piece of class old_piece on the square index with a piece of class new_piece"""
+        square_bit = 1 << square
+        self._bitboards[old_piece] ^= square_bit
+        self._bitboards[new_piece] |= square_bit
+        self._hash ^= ZOBRIST_PIECE_KEYS[old_piece][square] ^ ZOBRIST_PIECE_KEYS[new_piece][square]
+        self._piece_counts[old_piece] -= 1
+        self._piece_counts[new_piece] += 1
+        self._material_score += SIGNED_PIECE_VALUES[new_piece] - SIGNED_PIECE_VALUES[old_piece]
+        self._positional_score += (SIGNED_PIECE_SQUARE_VALUES[new_piece][square]
+                                   - SIGNED_PIECE_SQUARE_VALUES[old_piece][square])
+
+    def promote_regular_piece(self, color_index, square_location):
         """Promote a regular piece to king"""
-        if self._board[square_location[0]][square_location[1]] == " B ":
-            self._board[square_location[0]][square_location[1]] = "B K"
-        elif self._board[square_location[0]][square_location[1]] == " W ":
-            self._board[square_location[0]][square_location[1]] = "W K"
+        square = SQUARE_INDEX[square_location[0]][square_location[1]]
+        square_bit = 1 << square
+        bitboards = self._bitboards
+        if bitboards[BLACK_MAN] & square_bit:
+            self.replace_piece(square, BLACK_MAN, BLACK_KING)
+        elif bitboards[WHITE_MAN] & square_bit:
+            self.replace_piece(square, WHITE_MAN, WHITE_KING)
 
-        self._player[player_name].increment_king_count()
+        self._players[color_index].increment_king_count()
 
-    def promote_king_piece(self, player_name, square_location):
+    def promote_king_piece(self, color_index, square_location):
         """Promote a king piece to triple king"""
-        if self._board[square_location[0]][square_location[1]] == "B K":
-            self._board[square_location[0]][square_location[1]] = "BTK"
-        elif self._board[square_location[0]][square_location[1]] == "W K":
-            self._board[square_location[0]][square_location[1]] = "WTK"
-
-        self._player[player_name].decrement_king_count()
-        self._player[player_name].increment_triple_king_count()
+        square = SQUARE_INDEX[square_location[0]][square_location[1]]
+        square_bit = 1 << square
+        bitboards = self._bitboards
+        if bitboards[BLACK_KING] & square_bit:
+            self.replace_piece(square, BLACK_KING, BLACK_TRIPLE_KING)
+        elif bitboards[WHITE_KING] & square_bit:
+            self.replace_piece(square, WHITE_KING, WHITE_TRIPLE_KING)
+
+        self._players[color_index].decrement_king_count()
+        self._players[color_index].increment_triple_king_count()
+
+    def is_lost(self):
+        """Return True if the player whose turn it is has lost: the side to move loses once it has no piece or no
+        legal move left"""
+        return not self.generate_moves(COLOR_INDEX[self._player_turn], True)
 
     def game_winner(self):
-        """Check to see if a player has won the game"""
-        for player in self._player:
-            if self._player[player].get_captured_pieces_count() == 12:
-                print(f"{self._player[player].get_player_name()} won!")
+        """Check to see if a player has won the game by capturing all of the opponent's pieces"""
+        for color_index, player in enumerate(self._players):
+            if player is not None and self.get_color_piece_count(1 - color_index) == 0:
+                if self._trace_level >= TRACE_INFO:
+                    self.trace(TRACE_INFO, "winner", player=player.get_player_name())
                 return True
         else:
             return False
 
     def create_board(self):
-        """Create each row of the board as an array and append it to self._board"""
-        self._board.append([None, " W ", None, " W ", None, " W ", None, " W "])
-        self._board.append([" W ", None, " W ", None, " W ", None, " W ", None])
-        self._board.append([None, " W ", None, " W ", None, " W ", None, " W "])
-        self._board.append(["   ", None, "   ", None, "   ", None, "   ", None])
-        self._board.append([None, "   ", None, "   ", None, "   ", None, "   "])
-        self._board.append([" B ", None, " B ", None, " B ", None, " B ", None])
-        self._board.append([None, " B ", None, " B ", None, " B ", None, " B "])
-        self._board.append([" B ", None, " B ", None, " B ", None, " B ", None])
+        """Place the regular pieces of each player on their three starting rows of the bitboards"""
+        self._bitboards = [0] * 6
+        self._bitboards[WHITE_MAN] = 0x00000FFF  # Square 0 to 11 (row 0 to 2)
+        self._bitboards[BLACK_MAN] = 0xFFF00000  # Square 20 to 31 (row 5 to 7)
+        self._hash = self.compute_hash()
+        self.compute_material()
+
+    def clear_board(self):
+        """Remove every piece from the board"""
+        self._bitboards = [0] * 6
+        self._hash = self.compute_hash()
+        self.compute_material()
+        self.compute_player_counts()
+
+    def set_piece(self, square_location, checker_piece):
+        """Place the checker piece on the square location, replacing what was there ("   " leaves it empty)"""
+        square = SQUARE_INDEX[square_location[0]][square_location[1]]
+        if square is None:
+            raise InvalidSquare("Square location is not a playable square.")
+
+        square_bit = 1 << square
+        for piece in range(6):
+            self._bitboards[piece] &= ~square_bit
+        if checker_piece in PIECE_CLASSES:
+            self._bitboards[PIECE_CLASSES[checker_piece]] |= square_bit
+        self._hash = self.compute_hash()
+        self.compute_material()
+        self.compute_player_counts()
+
+    def get_bitboards(self):
+        """Return the six piece class bitboards as a tuple"""
+        return tuple(self._bitboards)
+
+    def set_position(self, bitboards, player_turn):
+        """Set up a position from six piece class bitboards and the color to move, with no jump continuation
+        pending. The players' king, triple king and captured pieces counts are derived from the pieces"""
+        self._bitboards = list(bitboards)
+        self._player_turn = player_turn
+        self._prev_color_index = None
+        self._prev_piece_coord = None
+        self._prev_move = False
+        self._prev_jump = False
+        self._hash_continuation_square = None
+        self._hash = self.compute_hash()
+        self.compute_material()
+        self.compute_player_counts()
+
+    def compute_player_counts(self):
+        """Derive the players' king, triple king and captured pieces counts from the pieces on the board"""
+        for color_index, player in enumerate(self._players):
+            if player is None:
+                continue
+            player.set_king_count(self._piece_counts[color_index * 3 + 1])
+            player.set_triple_king_count(self._piece_counts[color_index * 3 + 2])
+            player.set_captured_pieces_count(max(0, 12 - self.get_color_piece_count(1 - color_index)))
+
+    def get_memory_size(self):
+        """Return an estimate in bytes of the memory the game holds: the object, its attributes, the lists they
+        refer to and the players"""
+        size = sys.getsizeof(self)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(item) for item in value if item is not None)
+        for player in self._players:
+            if player is not None:
+                size += sys.getsizeof(player.get_player_name())
+        return size
+
+    def to_bytes(self):
+        """Return a compact binary snapshot of the game: the board in 12 bytes, the turn, the state of a jump
+        continuation and the players. Trace settings and subscribers are not part of it"""
+        bitboards = self._bitboards
+        flags = ((self._player_turn == "White") * SNAPSHOT_WHITE_TO_MOVE | self._prev_move * SNAPSHOT_PREV_MOVE
+                 | (self._prev_jump is True) * SNAPSHOT_PREV_JUMP)
+        if self._prev_color_index is not None:
+            flags |= (self._prev_color_index + 1) << SNAPSHOT_PREV_PLAYER_SHIFT
+        prev_square = (NO_SQUARE if self._prev_piece_coord is None
+                       else SQUARE_INDEX[self._prev_piece_coord[0]][self._prev_piece_coord[1]])
+        continuation_square = NO_SQUARE if self._hash_continuation_square is None else self._hash_continuation_square
+
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_VERSION, flags, prev_square, continuation_square,
+                                      bitboards[0] | bitboards[2] | bitboards[4],
+                                      bitboards[1] | bitboards[2] | bitboards[5],
+                                      bitboards[3] | bitboards[4] | bitboards[5])]
+        for player in self._players:
+            if player is None:
+                continue
+            player_name = player.get_player_name().encode()
+            counts = (player.get_king_count(), player.get_triple_king_count(), player.get_captured_pieces_count())
+            if not all(0 <= count <= 255 for count in counts):
+                raise InvalidSnapshot(f"The piece counts {counts} of player {player.get_player_name()} do not fit "
+                                      f"in a snapshot.")
+            if len(player_name) > 0xFFFF:
+                raise InvalidSnapshot("Player names are limited to 65535 bytes in a snapshot.")
+            parts.append(SNAPSHOT_PLAYER.pack(COLOR_INDEX[player.get_piece_color()], *counts, len(player_name)))
+            parts.append(player_name)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, snapshot):
+        """Create a game from a snapshot returned by to_bytes"""
+        version, flags, prev_square, continuation_square, plane_0, plane_1, plane_2 = \
+            SNAPSHOT_HEADER.unpack_from(snapshot)
+        if version != SNAPSHOT_VERSION:
+            raise InvalidSnapshot(f"Snapshot version {version} is not supported.")
+
+        # The starting board __init__ would set up is not needed, every attribute is set here
+        game = cls.__new__(cls)
+        game._players = [None, None]
+        game._trace_level = TRACE_OFF
+        game._trace_sink = print_trace
+        game._subscribers = ()
+        not_0, not_1, not_2 = ~plane_0, ~plane_1, ~plane_2
+        game._bitboards = [plane_0 & not_1 & not_2, not_0 & plane_1 & not_2, plane_0 & plane_1 & not_2,
+                           not_0 & not_1 & plane_2, plane_0 & not_1 & plane_2, not_0 & plane_1 & plane_2]
+        game._player_turn = COLORS[flags & SNAPSHOT_WHITE_TO_MOVE]
+        game._prev_move = bool(flags & SNAPSHOT_PREV_MOVE)
+        game._prev_jump = bool(flags & SNAPSHOT_PREV_JUMP)
+        game._prev_piece_coord = None if prev_square == NO_SQUARE else SQUARE_COORD[prev_square]
+        game._hash_continuation_square = None if continuation_square == NO_SQUARE else continuation_square
+        game._hash = game.compute_hash()
+        game.compute_material()
+
+        prev_color_index = (flags >> SNAPSHOT_PREV_PLAYER_SHIFT) - 1
+        game._prev_color_index = None if prev_color_index < 0 else prev_color_index
+        offset = SNAPSHOT_HEADER.size
+        while offset < len(snapshot):
+            color_index, king_count, triple_king_count, captured_pieces_count, name_length = \
+                SNAPSHOT_PLAYER.unpack_from(snapshot, offset)
+            offset += SNAPSHOT_PLAYER.size
+            player = game.create_player(snapshot[offset:offset + name_length].decode(), COLORS[color_index])
+            offset += name_length
+            player.set_king_count(king_count)
+            player.set_triple_king_count(triple_king_count)
+            player.set_captured_pieces_count(captured_pieces_count)
+        return game
+
+    def get_board(self):
+        """Return the board as a 2D list of piece symbols derived from the bitboards"""
+        board = [[None] * 8 for _ in range(8)]
+        for row, col in SQUARE_COORD:
+            board[row][col] = "   "
+        for piece, bitboard in enumerate(self._bitboards):
+            while bitboard:
+                square_bit = bitboard & -bitboard
+                row, col = SQUARE_COORD[square_bit.bit_length() - 1]
+                board[row][col] = PIECE_SYMBOLS[piece]
+                bitboard ^= square_bit
+        return board
 
     def print_board(self):
         """Print the current board in the form of 2D list"""
-        for row in self._board:
+        for row in self.get_board():
             print(row)
 
 
+def format_trace(trace_level, event, fields):
+    """Format a trace event as one line, e.g. "[INFO] move player=Lucy start=(5, 6) destination=(4, 7)" """
+    details = " ".join(f"{name}={value}" for name, value in fields.items())
+    return f"[{TRACE_LEVEL_NAMES[trace_level]}] {event} {details}"
+
+
+def print_trace(trace_level, event, fields):
+    """Default trace sink, printing each event on its own line"""
+    print(format_trace(trace_level, event, fields))
+
+
 class OutofTurn(Exception):
     """Exception for when a player attempts to move a piece out of turn"""
     pass
@@ -839,4 +1261,9 @@ class InvalidPlayer(Exception):
 
 class InvalidSquare(Exception):
     """Exception for when a player attempts to move to an invalid square"""
-    pass
\ No newline at end of file
+    pass
+
+
+class InvalidSnapshot(Exception):
+    """Exception for when a game cannot be written to or read from a snapshot"""
+    pass
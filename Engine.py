@@ -0,0 +1,259 @@
+import time
+from Checkers import *
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from Tablebase import WIN_VALUE
+
+WIN_SCORE = 100000
+MAX_DEPTH = 64
+MAX_PLY = 128
+
+# Move ordering scores, captures are searched first, then the killer moves, then by history heuristic
+CAPTURE_ORDER = 1 << 30
+KILLER_ORDER = 1 << 29
+
+
+class Engine:
+    """
+    Represents a negamax alpha-beta search engine with iterative deepening, playing through the
+    legal_moves, make_move and unmake_move methods of a Checkers game.
+    """
+
+    def __init__(self, tt_size_mb=16, tablebase=None, opening_book=None):
+        self._transposition_table = TranspositionTable(tt_size_mb)
+        self._tablebase = tablebase
+        self._opening_book = opening_book
+        self._tablebase_hits = 0
+        self._nodes = 0
+        self._depth = 0
+        self._score = 0
+        self._elapsed = 0.0
+        self._deadline = 0.0
+        self._stopped = False
+        self._killer_moves = [[None, None] for _ in range(MAX_PLY)]
+        self._history = {}
+
+    def get_transposition_table(self):
+        """Retrieve the transposition table, kept across searches, to read its hit rate"""
+        return self._transposition_table
+
+    def get_tablebase_hits(self):
+        """Retrieve the number of positions of the last search answered by the endgame tablebase"""
+        return self._tablebase_hits
+
+    def get_nodes(self):
+        """Retrieve the number of nodes visited by the last search"""
+        return self._nodes
+
+    def get_depth(self):
+        """Retrieve the deepest iteration completed by the last search"""
+        return self._depth
+
+    def get_score(self):
+        """Retrieve the score of the last search from the point of view of the side to move"""
+        return self._score
+
+    def get_nodes_per_second(self):
+        """Retrieve the search speed of the last search"""
+        if self._elapsed == 0:
+            return 0.0
+        return self._nodes / self._elapsed
+
+    def best_move(self, game, time_ms, max_depth=MAX_DEPTH):
+        """Search deeper and deeper until the time budget (in milliseconds) runs out or max_depth is reached,
+        and return the best move of the last completed iteration. A position in the opening book is not searched"""
+        start_time = time.perf_counter()
+        self._deadline = start_time + time_ms / 1000
+        self._nodes = 0
+        self._tablebase_hits = 0
+        self._depth = 0
+        self._score = 0
+        self._stopped = False
+
+        moves = game.legal_moves()
+        if not moves:
+            return None
+        if self._opening_book is not None:
+            book_move = self._opening_book.book_move(game)
+            if book_move in moves:
+                self._elapsed = time.perf_counter() - start_time
+                return book_move
+        best_move = moves[0]
+
+        for depth in range(1, max_depth + 1):
+            move, score = self.search_root(game, moves, best_move, depth)
+            if self._stopped:
+                break
+            best_move = move
+            self._depth = depth
+            self._score = score
+
+            # No need to search deeper once a forced win or loss is found
+            if abs(score) >= WIN_SCORE - MAX_PLY:
+                break
+
+        self._elapsed = time.perf_counter() - start_time
+        return best_move
+
+    def search_root(self, game, moves, previous_best_move, depth):
+        """Search every root move to the depth, starting with the best move of the previous iteration"""
+        self.order_moves(game, moves, 0, previous_best_move)
+        player_turn = game.get_player_turn()
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = moves[0]
+
+        for move in moves:
+            record = game.make_move(move)
+            if game.get_player_turn() == player_turn:
+                score = self.negamax(game, depth, alpha, beta, 1)
+            else:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, 1)
+            game.unmake_move(record)
+
+            if self._stopped:
+                break
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        return best_move, alpha
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """Return the score of the position from the point of view of the side to move"""
+        self._nodes += 1
+        if self._nodes & 1023 == 0 and time.perf_counter() >= self._deadline:
+            self._stopped = True
+        if self._stopped:
+            return 0
+
+        # Endgames covered by the tablebase have an exact result
+        if self._tablebase is not None:
+            value = self._tablebase.probe_value(game)
+            if value is not None:
+                self._tablebase_hits += 1
+                return tablebase_score(value, ply)
+
+        # A pending jump continuation is searched to the end before the position is evaluated
+        player_turn = game.get_player_turn()
+        if depth <= 0 and not game.is_jump_continuation_pending(COLOR_INDEX[player_turn]):
+            return self.evaluate(game)
+
+        # Reuse the result of an earlier search of the same position if it was deep enough
+        position_hash = game.get_hash()
+        entry = self._transposition_table.probe(position_hash)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            if entry_depth >= depth:
+                entry_score = score_from_table(entry_score, ply)
+                if bound == EXACT:
+                    return entry_score
+                if bound == LOWER_BOUND and entry_score >= beta:
+                    return entry_score
+                if bound == UPPER_BOUND and entry_score <= alpha:
+                    return entry_score
+
+        if game.is_lost():
+            return -WIN_SCORE + ply
+        moves = game.legal_moves()
+
+        original_alpha = alpha
+        best_move = None
+        self.order_moves(game, moves, ply, table_move)
+        for move in moves:
+            record = game.make_move(move)
+            if game.get_player_turn() == player_turn:
+                score = self.negamax(game, depth, alpha, beta, ply + 1)
+            else:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.unmake_move(record)
+
+            if self._stopped:
+                return 0
+            if score > alpha:
+                alpha = score
+                best_move = move
+                if alpha >= beta:
+                    self.store_cutoff(game, move, depth, ply)
+                    break
+
+        if alpha >= beta:
+            bound = LOWER_BOUND
+        elif alpha > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER_BOUND
+        self._transposition_table.store(position_hash, depth, score_to_table(alpha, ply), bound, best_move)
+        return alpha
+
+    def store_cutoff(self, game, move, depth, ply):
+        """Remember a quiet move that caused a beta cutoff as a killer move and in the history table"""
+        if ply >= MAX_PLY or get_move_capture_count(game, move):
+            return
+        killer_moves = self._killer_moves[ply]
+        if killer_moves[0] != move:
+            killer_moves[1] = killer_moves[0]
+            killer_moves[0] = move
+        self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def order_moves(self, game, moves, ply, first_move=None):
+        """Sort the moves of the position in place so that the most promising ones are searched first"""
+        killer_moves = self._killer_moves[ply] if ply < MAX_PLY else (None, None)
+        history = self._history
+
+        def order_score(move):
+            if move == first_move:
+                return CAPTURE_ORDER << 1
+            capture_count = get_move_capture_count(game, move)
+            if capture_count:
+                return CAPTURE_ORDER + capture_count
+            if move == killer_moves[0] or move == killer_moves[1]:
+                return KILLER_ORDER
+            return history.get(move, 0)
+
+        moves.sort(key=order_score, reverse=True)
+
+    def evaluate(self, game):
+        """Return the score of the position from the point of view of the side to move"""
+        return game.evaluate()
+
+
+def score_to_table(score, ply):
+    """Store win/loss scores as distance from the stored position rather than from the root"""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -WIN_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """Convert a stored win/loss score back to distance from the root"""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -WIN_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def tablebase_score(value, ply):
+    """Convert a tablebase value, a win or loss in some plies from this position, to a score from the root"""
+    if value > 0:
+        return WIN_SCORE - ply - (WIN_VALUE - value)
+    if value < 0:
+        return -WIN_SCORE + ply + (WIN_VALUE + value)
+    return 0
+
+
+def get_move_capture_count(game, move):
+    """Return the number of opponent pieces a move of the side to move captures, 0 for a quiet move. King and
+    triple king slides travel several squares too, so the distance alone does not make a move a capture"""
+    starting_sq_loc, destination_sq_loc = move
+    if destination_sq_loc[0] - starting_sq_loc[0] in (1, -1):
+        return 0
+    return game.get_capture_count(COLOR_INDEX[game.get_player_turn()], starting_sq_loc, destination_sq_loc)
+
+
+def best_move(game, time_ms, max_depth=MAX_DEPTH):
+    """Return the best move for the side to move found by a fresh Engine within the time budget"""
+    return Engine().best_move(game, time_ms, max_depth)
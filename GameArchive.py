@@ -0,0 +1,182 @@
+import argparse
+import mmap
+import struct
+from GameRecord import GameRecordReader, GameRecordWriter, decode_game, InvalidRecord
+
+# An archive starts with the magic bytes, a format version, the number of games and the offset of the index,
+# followed by the encoded games back to back, then the index: the offset of every game plus the end offset
+ARCHIVE_MAGIC = b"SCGA"
+ARCHIVE_VERSION = 1
+ARCHIVE_HEADER = struct.Struct("<4sB3xQQ")
+INDEX_ENTRY = struct.Struct("<Q")
+
+# Archives opened by get_shared_archive in this process, by path
+_shared_archives = {}
+
+
+class GameArchiveWriter:
+    """
+    Represents a writer of a game archive, appending encoded games and writing the game offset index on close.
+    """
+
+    def __init__(self, archive_path):
+        self._file = open(archive_path, "wb")
+        self._file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, 0))
+        # The games are encoded as in a game record file, without its file header
+        self._record_writer = GameRecordWriter(self._file, write_header=False)
+        self._offsets = [ARCHIVE_HEADER.size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_game_count(self):
+        """Retrieve the number of games written"""
+        return self._record_writer.get_game_count()
+
+    def write_game(self, black_name, white_name, result, move_codes):
+        """Append one game, move_codes being an iterable of move codes as returned by encode_move"""
+        self._record_writer.write_game(black_name, white_name, result, move_codes)
+        self._offsets.append(self._file.tell())
+
+    def write_record(self, record):
+        """Append a GameRecord"""
+        self._record_writer.write_record(record)
+        self._offsets.append(self._file.tell())
+
+    def close(self):
+        """Write the index (aligned to 8 bytes), then the header that points to it, and close the file"""
+        if self._file.closed:
+            return
+        padding = -self._offsets[-1] % INDEX_ENTRY.size
+        self._file.write(bytes(padding))
+        index_offset = self._offsets[-1] + padding
+        for offset in self._offsets:
+            self._file.write(INDEX_ENTRY.pack(offset))
+        self._file.seek(0)
+        self._file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, len(self._offsets) - 1, index_offset))
+        self._file.close()
+
+
+class GameArchive:
+    """
+    Represents a read-only, memory-mapped game archive. Game k is found through the index without reading the
+    rest of the file, and worker processes that open the same archive share its pages through the OS page cache.
+    """
+
+    def __init__(self, archive_path):
+        self._archive_path = archive_path
+        with open(archive_path, "rb") as archive_file:
+            try:
+                self._mmap = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped
+                raise InvalidRecord("The file is too short to be a game archive.") from None
+
+        if len(self._mmap) < ARCHIVE_HEADER.size:
+            self._mmap.close()
+            raise InvalidRecord("The file is too short to be a game archive.")
+        magic, version, self._game_count, self._index_offset = ARCHIVE_HEADER.unpack_from(self._mmap)
+        if magic != ARCHIVE_MAGIC:
+            self._mmap.close()
+            raise InvalidRecord("The file is not a game archive.")
+        if version != ARCHIVE_VERSION:
+            self._mmap.close()
+            raise InvalidRecord(f"Unsupported game archive version {version}.")
+        if self._index_offset + (self._game_count + 1) * INDEX_ENTRY.size > len(self._mmap):
+            self._mmap.close()
+            raise InvalidRecord("The game archive index is truncated.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._game_count
+
+    def __getitem__(self, game_index):
+        return self.get_game(game_index)
+
+    def __iter__(self):
+        return self.iter_games()
+
+    def get_archive_path(self):
+        """Retrieve the path of the archive file"""
+        return self._archive_path
+
+    def get_game_count(self):
+        """Retrieve the number of games in the archive"""
+        return self._game_count
+
+    def get_game_span(self, game_index):
+        """Return the (start, end) byte offsets of game game_index in the archive"""
+        if not 0 <= game_index < self._game_count:
+            raise IndexError(f"Game {game_index} is not in the archive.")
+        entry_offset = self._index_offset + game_index * INDEX_ENTRY.size
+        start = INDEX_ENTRY.unpack_from(self._mmap, entry_offset)[0]
+        end = INDEX_ENTRY.unpack_from(self._mmap, entry_offset + INDEX_ENTRY.size)[0]
+        if not ARCHIVE_HEADER.size <= start <= end <= self._index_offset:
+            raise InvalidRecord(f"The game archive index entry of game {game_index} is corrupt.")
+        return start, end
+
+    def get_game_bytes(self, game_index):
+        """Return a memoryview of the encoded bytes of game game_index in the mapping, without copying them. It has
+        to be released before the archive is closed"""
+        start, end = self.get_game_span(game_index)
+        return memoryview(self._mmap)[start:end]
+
+    def get_game(self, game_index):
+        """Return game game_index as a GameRecord"""
+        with self.get_game_bytes(game_index) as game_bytes:
+            return decode_game(game_bytes)
+
+    def replay_game(self, game_index):
+        """Replay game game_index through Checkers and return the game"""
+        return self.get_game(game_index).replay()
+
+    def iter_games(self, start=0, stop=None):
+        """Yield the GameRecord of games start to stop (excluded, the end of the archive by default)"""
+        stop = self._game_count if stop is None else min(stop, self._game_count)
+        for game_index in range(start, stop):
+            yield self.get_game(game_index)
+
+    def close(self):
+        """Unmap the archive"""
+        self._mmap.close()
+
+
+def get_shared_archive(archive_path):
+    """Return this process's mapping of the archive, opening it on first use, so that pool tasks can be sent
+    (archive_path, game_index) pairs instead of game data and every worker maps the file only once"""
+    archive = _shared_archives.get(archive_path)
+    if archive is None:
+        archive = _shared_archives[archive_path] = GameArchive(archive_path)
+    return archive
+
+
+def build_archive(archive_path, record_paths):
+    """Build an archive from game record files, streaming one game at a time, and return its game count"""
+    with GameArchiveWriter(archive_path) as archive_writer:
+        for record_path in record_paths:
+            with open(record_path, "rb") as record_file:
+                for record in GameRecordReader(record_file):
+                    archive_writer.write_record(record)
+        return archive_writer.get_game_count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a game archive from game record files.")
+    parser.add_argument("archive", help="archive file to create")
+    parser.add_argument("records", nargs="+", help="game record files to archive, in order")
+    args = parser.parse_args()
+
+    game_count = build_archive(args.archive, args.records)
+    print(f"Archived {game_count} games to {args.archive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import struct
+import sys
+from array import array
+from Checkers import *
+
+# A record file starts with the magic bytes and a format version, followed by the games back to back
+FILE_MAGIC = b"SCGR"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+
+# Each game starts with its result, the byte lengths of the Black and White player names and the number of
+# plies, then the UTF-8 names, then one 16-bit move code per ply
+GAME_HEADER = struct.Struct("<BBBH")
+RESULT_BLACK_WIN, RESULT_WHITE_WIN, RESULT_DRAW, RESULT_UNFINISHED = range(4)
+RESULT_NAMES = ("Black", "White", "draw", "unfinished")
+
+# Move code: starting square index in bits 5-9, destination square index in bits 0-4, then flags
+MOVE_JUMP = 1 << 10
+MOVE_CONTINUES = 1 << 11
+MOVE_PROMOTES = 1 << 12
+MOVE_SQUARES = 0x3FF
+
+
+class GameRecord:
+    """
+    Represents one recorded game: the player names by color, the result and the encoded move of each ply.
+    """
+
+    def __init__(self, black_name, white_name, result, move_codes):
+        self._black_name = black_name
+        self._white_name = white_name
+        self._result = result
+        self._move_codes = move_codes
+
+    def get_black_name(self):
+        """Retrieve the name of the player playing Black"""
+        return self._black_name
+
+    def get_white_name(self):
+        """Retrieve the name of the player playing White"""
+        return self._white_name
+
+    def get_result(self):
+        """Retrieve the result, one of RESULT_BLACK_WIN, RESULT_WHITE_WIN, RESULT_DRAW or RESULT_UNFINISHED"""
+        return self._result
+
+    def get_move_codes(self):
+        """Retrieve the array of 16-bit move codes, one per ply"""
+        return self._move_codes
+
+    def get_ply_count(self):
+        """Retrieve the number of plies"""
+        return len(self._move_codes)
+
+    def get_moves(self):
+        """Return the (starting square location, destination square location) pair of each ply"""
+        return [decode_move(move_code) for move_code in self._move_codes]
+
+    def get_player_names(self):
+        """Return the (Black, White) names to create the players with, players with the same name being told
+        apart by their color"""
+        if self._black_name == self._white_name:
+            return f"{self._black_name} (Black)", f"{self._white_name} (White)"
+        return self._black_name, self._white_name
+
+    def create_game(self):
+        """Create a game at the starting position with both players"""
+        black_name, white_name = self.get_player_names()
+        game = Checkers()
+        game.create_player(black_name, "Black")
+        game.create_player(white_name, "White")
+        return game
+
+    def replay(self, game=None):
+        """Play every ply through play_game, which validates it, and return the game. A fresh game with both
+        players is created unless one is given"""
+        if game is None:
+            game = self.create_game()
+        for move_code in self._move_codes:
+            starting_sq_loc, destination_sq_loc = decode_move(move_code)
+            game.play_game(game.get_current_player_name(), starting_sq_loc, destination_sq_loc)
+        return game
+
+
+class GameRecordWriter:
+    """
+    Represents a streaming writer of game records to a binary file object, one game at a time.
+    """
+
+    def __init__(self, file, write_header=True):
+        self._file = file
+        self._game_count = 0
+        if write_header:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+
+    def get_game_count(self):
+        """Retrieve the number of games written"""
+        return self._game_count
+
+    def write_game(self, black_name, white_name, result, move_codes):
+        """Append one game, move_codes being an iterable of move codes as returned by encode_move"""
+        self._file.write(encode_game(black_name, white_name, result, move_codes))
+        self._game_count += 1
+
+    def write_record(self, record):
+        """Append a GameRecord"""
+        self.write_game(record.get_black_name(), record.get_white_name(), record.get_result(),
+                        record.get_move_codes())
+
+
+class GameRecordReader:
+    """
+    Represents a streaming reader of the game records of a binary file object. Iterating over it reads one
+    game at a time, so a file never has to fit in memory.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        header = file.read(FILE_HEADER.size)
+        if len(header) != FILE_HEADER.size:
+            raise InvalidRecord("The file is too short to be a game record file.")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != FILE_MAGIC:
+            raise InvalidRecord("The file is not a game record file.")
+        if version != FILE_VERSION:
+            raise InvalidRecord(f"Unsupported game record version {version}.")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        record = self.read_game()
+        if record is None:
+            raise StopIteration
+        return record
+
+    def read_game(self):
+        """Read the next game, or return None at the end of the file"""
+        header = self._file.read(GAME_HEADER.size)
+        if not header:
+            return None
+        if len(header) != GAME_HEADER.size:
+            raise InvalidRecord("The file ends in the middle of a game header.")
+        result, black_length, white_length, ply_count = GAME_HEADER.unpack(header)
+
+        body_length = black_length + white_length + 2 * ply_count
+        body = self._file.read(body_length)
+        if len(body) != body_length:
+            raise InvalidRecord("The file ends in the middle of a game.")
+        return parse_game_body(result, black_length, white_length, body)
+
+
+def encode_game(black_name, white_name, result, move_codes):
+    """Return the bytes of one game: its header, the player names and the move codes"""
+    black_bytes = black_name.encode()
+    white_bytes = white_name.encode()
+    moves = array("H", move_codes)
+    if len(black_bytes) > 255 or len(white_bytes) > 255:
+        raise ValueError("Player names are limited to 255 bytes.")
+    if len(moves) > 0xFFFF:
+        raise ValueError("Games are limited to 65535 plies.")
+
+    if sys.byteorder == "big":
+        moves.byteswap()
+    return (GAME_HEADER.pack(result, len(black_bytes), len(white_bytes), len(moves)) + black_bytes + white_bytes
+            + moves.tobytes())
+
+
+def decode_game(data):
+    """Build a GameRecord from the bytes of one game as returned by encode_game, or a memoryview of them"""
+    result, black_length, white_length, ply_count = GAME_HEADER.unpack_from(data)
+    body = data[GAME_HEADER.size:GAME_HEADER.size + black_length + white_length + 2 * ply_count]
+    if len(body) != black_length + white_length + 2 * ply_count:
+        raise InvalidRecord("The game is truncated.")
+    return parse_game_body(result, black_length, white_length, body)
+
+
+def parse_game_body(result, black_length, white_length, body):
+    """Build a GameRecord from the names and move codes that follow a game header"""
+    black_name = str(body[:black_length], "utf-8")
+    white_name = str(body[black_length:black_length + white_length], "utf-8")
+    move_codes = array("H")
+    move_codes.frombytes(body[black_length + white_length:])
+    if sys.byteorder == "big":
+        move_codes.byteswap()
+    return GameRecord(black_name, white_name, result, move_codes)
+
+
+def encode_move(move, flags=0):
+    """Pack a (starting square location, destination square location) pair and its flags into a move code"""
+    (start_row, start_col), (destination_row, destination_col) = move
+    return SQUARE_INDEX[start_row][start_col] << 5 | SQUARE_INDEX[destination_row][destination_col] | flags
+
+
+def decode_move(move_code):
+    """Unpack the (starting square location, destination square location) pair of a move code"""
+    return SQUARE_COORD[(move_code >> 5) & 31], SQUARE_COORD[move_code & 31]
+
+
+def record_move(game, move):
+    """Play a legal move with make_move and return its move code, flagged as a jump, as continuing (the same
+    player has to jump again) and as promoting the piece"""
+    (start_row, start_col), (destination_row, destination_col) = move
+    piece = game.get_piece_class(SQUARE_INDEX[start_row][start_col])
+    player_turn = game.get_player_turn()
+    game.make_move(move)
+
+    flags = 0
+    if abs(destination_row - start_row) > 1:
+        flags |= MOVE_JUMP
+        if game.get_player_turn() == player_turn:
+            flags |= MOVE_CONTINUES
+    if game.get_piece_class(SQUARE_INDEX[destination_row][destination_col]) != piece:
+        flags |= MOVE_PROMOTES
+    return encode_move(move, flags)
+
+
+class InvalidRecord(Exception):
+    """Exception for when a game record file is malformed"""
+    pass
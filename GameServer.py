@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Checkers import *
+
+# Errors play_game raises for a move that is not allowed, reported to the client by name
+MOVE_ERRORS = (OutofTurn, InvalidSquare, InvalidPlayer)
+
+# Number of recent play commands whose handling time is kept for the stats command
+PLAY_TIMES_KEPT = 100000
+
+# Bytes waiting to be sent to a spectator above which it stops being sent deltas, so that a client that does not
+# read them cannot make the server buffer without bound
+SPECTATOR_BUFFER_LIMIT = 1 << 20
+
+
+class GameSession:
+    """
+    Represents one game hosted by the server, with a lock that keeps its commands in order while one of them is
+    being validated in the worker pool, and the spectators every move's BoardDelta is sent to.
+    """
+
+    def __init__(self, game_id, game):
+        self._game_id = game_id
+        self._game = game
+        self._lock = asyncio.Lock()
+        self._spectators = set()
+        self._last_delta = None
+        game.subscribe(self.publish)
+
+    def get_game_id(self):
+        """Retrieve the game id"""
+        return self._game_id
+
+    def get_game(self):
+        """Retrieve the Checkers game"""
+        return self._game
+
+    def set_game(self, game):
+        """Replace the game with one a worker process has played a move into, keeping the spectators"""
+        self._game.unsubscribe(self.publish)
+        self._game = game
+        game.subscribe(self.publish)
+
+    def get_lock(self):
+        """Retrieve the lock held while a command runs on the game"""
+        return self._lock
+
+    def get_last_delta(self):
+        """Retrieve the BoardDelta of the last move played, or None"""
+        return self._last_delta
+
+    def add_spectator(self, writer):
+        """Send the deltas of the game to a client connection from now on"""
+        self._spectators.add(writer)
+
+    def remove_spectator(self, writer):
+        """Stop sending the deltas of the game to a client connection"""
+        self._spectators.discard(writer)
+
+    def publish(self, board_delta):
+        """Keep the delta of the move played and send it to every spectator, dropping the spectators that have
+        fallen SPECTATOR_BUFFER_LIMIT bytes behind"""
+        self._last_delta = board_delta
+        if self._spectators:
+            line = json.dumps({"event": "delta", "game": self._game_id, "delta": board_delta.to_dict()}).encode()
+            for writer in list(self._spectators):
+                if writer.is_closing():
+                    self._spectators.discard(writer)
+                elif writer.transport.get_write_buffer_size() > SPECTATOR_BUFFER_LIMIT:
+                    # The spectator has to watch the game again to catch up from its board
+                    self._spectators.discard(writer)
+                    writer.write(json.dumps({"event": "dropped", "game": self._game_id}).encode() + b"\n")
+                else:
+                    writer.write(line + b"\n")
+
+
+class GameServer:
+    """
+    Represents an asyncio server hosting many Checkers games keyed by game id. Clients send one JSON command per
+    line and receive one JSON response per line; a played move is answered with its BoardDelta, which is also sent
+    to the connections watching the game.
+    King and triple king jumps are played in a worker process pool when one is configured, the worker sending back
+    the game after the move.
+    """
+
+    def __init__(self, workers=0):
+        self._sessions = {}
+        self._next_game_id = 0
+        self._command_count = 0
+        self._play_times = deque(maxlen=PLAY_TIMES_KEPT)
+        self._executor = ProcessPoolExecutor(workers) if workers else None
+
+    def get_session_count(self):
+        """Retrieve the number of games hosted"""
+        return len(self._sessions)
+
+    def get_command_count(self):
+        """Retrieve the number of commands handled"""
+        return self._command_count
+
+    def get_play_time_percentile(self, percentile):
+        """Return a percentile in seconds of the time spent handling recent play commands, or None"""
+        if not self._play_times:
+            return None
+        play_times = sorted(self._play_times)
+        return play_times[min(len(play_times) - 1, int(len(play_times) * percentile / 100))]
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening and return the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=1 << 16)
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        """Answer the commands of one client connection in order, the games it created are closed when it leaves"""
+        owned_game_ids = set()
+        watched_sessions = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = await self.handle_command(request, owned_game_ids, writer, watched_sessions)
+                except (ValueError, LookupError, TypeError, AttributeError) as error:
+                    response = {"ok": False, "error": "BadRequest", "message": str(error)}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session in watched_sessions:
+                session.remove_spectator(writer)
+            for game_id in owned_game_ids:
+                self._sessions.pop(game_id, None)
+            writer.close()
+
+    async def handle_command(self, request, owned_game_ids, writer=None, watched_sessions=None):
+        """Run one command of a client connection and return its response"""
+        self._command_count += 1
+        op = request["op"]
+
+        if op == "new":
+            game = Checkers()
+            game.create_player(request.get("black", "Black"), "Black")
+            game.create_player(request.get("white", "White"), "White")
+            game_id = self._next_game_id
+            self._next_game_id += 1
+            self._sessions[game_id] = GameSession(game_id, game)
+            owned_game_ids.add(game_id)
+            return {"ok": True, "game": game_id}
+        if op == "stats":
+            return {"ok": True, "sessions": len(self._sessions), "commands": self._command_count,
+                    "play_ms": {str(percentile): self.get_play_time_percentile(percentile) * 1000
+                                for percentile in (50, 99) if self._play_times}}
+
+        session = self._sessions.get(request["game"])
+        if session is None:
+            return {"ok": False, "error": "UnknownGame", "message": f"Game {request['game']} does not exist."}
+        game = session.get_game()
+
+        if op == "play":
+            start_time = time.perf_counter()
+            response = await self.play(session, request["player"], parse_square_location(request["from"]),
+                                       parse_square_location(request["to"]))
+            self._play_times.append(time.perf_counter() - start_time)
+            return response
+        if op == "legal":
+            return {"ok": True, "moves": game.legal_moves(), "turn": game.get_player_turn()}
+        if op == "board":
+            return {"ok": True, "board": game.get_board(), "turn": game.get_player_turn()}
+        if op == "watch":
+            session.add_spectator(writer)
+            watched_sessions.add(session)
+            return {"ok": True, "board": game.get_board(), "turn": game.get_player_turn()}
+        if op == "unwatch":
+            session.remove_spectator(writer)
+            watched_sessions.discard(session)
+            return {"ok": True}
+        if op == "close":
+            self._sessions.pop(session.get_game_id(), None)
+            owned_game_ids.discard(session.get_game_id())
+            return {"ok": True}
+        return {"ok": False, "error": "BadRequest", "message": f"Unknown op {op}."}
+
+    async def play(self, session, player_name, starting_sq_loc, destination_sq_loc):
+        """Play a move through play_game and return its BoardDelta, or the error it raised"""
+        async with session.get_lock():
+            game = session.get_game()
+            if self._executor is not None and is_king_jump(game, starting_sq_loc, destination_sq_loc):
+                error, snapshot, delta_fields = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, play_snapshot, game.to_bytes(), player_name, starting_sq_loc, destination_sq_loc)
+                if error is not None:
+                    return {"ok": False, "error": error[0], "message": error[1]}
+                # The move is not validated or played again, the game is the one the worker sent back
+                session.set_game(Checkers.from_bytes(snapshot))
+                session.publish(BoardDelta.from_dict(delta_fields))
+                return {"ok": True, "delta": delta_fields}
+
+            try:
+                game.play_game(player_name, starting_sq_loc, destination_sq_loc)
+            except MOVE_ERRORS as error:
+                return {"ok": False, "error": type(error).__name__, "message": str(error)}
+            return {"ok": True, "delta": session.get_last_delta().to_dict()}
+
+
+def parse_square_location(value):
+    """Return a square location sent by a client as a (row, column) tuple, raising ValueError unless it is a pair
+    of integers"""
+    if not isinstance(value, list) or len(value) != 2 or not all(type(coordinate) is int for coordinate in value):
+        raise ValueError(f"A square location is a [row, column] pair of integers, not {value!r}.")
+    return tuple(value)
+
+
+def is_king_jump(game, starting_sq_loc, destination_sq_loc):
+    """Return True if the move is a jump of a king or triple king, the moves whose validation is the most work"""
+    row, col = starting_sq_loc
+    if not (0 <= row <= 7 and 0 <= col <= 7) or SQUARE_INDEX[row][col] is None:
+        return False
+    piece = game.get_piece_class(SQUARE_INDEX[row][col])
+    return piece is not None and piece % 3 != 0 and abs(destination_sq_loc[0] - row) > 1
+
+
+def play_snapshot(snapshot, player_name, starting_sq_loc, destination_sq_loc):
+    """Play the move on the game restored from its snapshot in the worker. Return (None, snapshot of the game after
+    the move, BoardDelta dictionary) if it is allowed, otherwise ((error name, message), None, None) for the
+    exception play_game raised"""
+    game = Checkers.from_bytes(snapshot)
+    board_deltas = []
+    game.subscribe(board_deltas.append)
+    try:
+        game.play_game(player_name, starting_sq_loc, destination_sq_loc)
+    except MOVE_ERRORS as error:
+        return (type(error).__name__, str(error)), None, None
+    return None, game.to_bytes(), board_deltas[0].to_dict()
+
+
+async def serve(host, port, workers):
+    """Run the server until it is interrupted"""
+    game_server = GameServer(workers)
+    server = await game_server.start(host, port)
+    print(f"Serving Super-Checkers on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Super-Checkers games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes playing king and triple king jumps (default: play them inline)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+# Percentiles of the move latency reported
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class ServerConnection:
+    """
+    Represents one client connection to a GameServer, shared by many game sessions. Requests carry an id so that
+    the responses of interleaved sessions are matched to the request that asked for them.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._request_ids = itertools.count()
+        self._pending = {}
+        self._reader_task = asyncio.create_task(self.read_responses())
+
+    @classmethod
+    async def open(cls, host, port):
+        """Connect to the server"""
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+        return cls(reader, writer)
+
+    async def read_responses(self):
+        """Resolve the pending request of every response received"""
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("The server closed the connection."))
+
+    async def request(self, **command):
+        """Send a command and return the server's response"""
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        command["id"] = request_id
+        self._writer.write(json.dumps(command).encode() + b"\n")
+        return await future
+
+    async def close(self):
+        """Close the connection"""
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._reader_task.cancel()
+
+
+async def run_session(connection, rng, max_moves, think_time, latencies):
+    """Play one game of random legal moves, waiting about think_time seconds before each one, appending the
+    latency in seconds of each played move. Return the number of moves played"""
+    await asyncio.sleep(rng.uniform(0, think_time))
+    response = await connection.request(op="new", black="Black", white="White")
+    game_id = response["game"]
+    move_count = 0
+    while move_count < max_moves:
+        response = await connection.request(op="legal", game=game_id)
+        if not response["moves"]:
+            break
+        starting_sq_loc, destination_sq_loc = rng.choice(response["moves"])
+        start_time = time.perf_counter()
+        response = await connection.request(op="play", game=game_id, player=response["turn"],
+                                            **{"from": starting_sq_loc, "to": destination_sq_loc})
+        latencies.append(time.perf_counter() - start_time)
+        if not response["ok"]:
+            raise RuntimeError(f"Game {game_id} rejected a legal move: {response['message']}")
+        move_count += 1
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+    await connection.request(op="close", game=game_id)
+    return move_count
+
+
+def get_percentile(sorted_values, percentile):
+    """Return the nearest-rank percentile of sorted values"""
+    rank = max(1, -(-len(sorted_values) * percentile // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def generate_load(host, port, sessions, connections, max_moves, think_time, seed, report=print):
+    """Play sessions concurrent games over a number of connections, each session waiting about think_time seconds
+    between its moves, and return the sorted move latencies"""
+    rng = random.Random(seed)
+    server_connections = [await ServerConnection.open(host, port) for _ in range(connections)]
+    latencies = []
+    start_time = time.perf_counter()
+    move_counts = await asyncio.gather(*(
+        run_session(server_connections[session % connections], random.Random(rng.getrandbits(64)), max_moves,
+                    think_time, latencies)
+        for session in range(sessions)))
+    elapsed = time.perf_counter() - start_time
+    stats = await server_connections[0].request(op="stats")
+    for connection in server_connections:
+        await connection.close()
+
+    latencies.sort()
+    if report is not None and latencies:
+        report(f"{sessions} sessions over {connections} connections: {sum(move_counts)} moves in {elapsed:.1f} s "
+               f"({sum(move_counts) / elapsed:.0f} moves/s)")
+        report("move latency: " + ", ".join(f"p{percentile} {get_percentile(latencies, percentile) * 1000:.2f} ms"
+                                            for percentile in LATENCY_PERCENTILES))
+        report("server play handling: " + ", ".join(f"p{percentile} {milliseconds:.3f} ms"
+                                                      for percentile, milliseconds in stats["play_ms"].items()))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many concurrent games against a GameServer and measure "
+                                                 "move latency.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=8765, help="server port")
+    parser.add_argument("--sessions", type=int, default=10000, help="concurrent games")
+    parser.add_argument("--connections", type=int, default=100, help="connections the games are spread over")
+    parser.add_argument("--moves", type=int, default=40, help="moves played per game at most")
+    parser.add_argument("--think-ms", type=float, default=2000, help="average wait of a game between its moves")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the moves chosen")
+    args = parser.parse_args()
+    asyncio.run(generate_load(args.host, args.port, args.sessions, args.connections, args.moves,
+                               args.think_ms / 1000, args.seed))
+
+
+if __name__ == "__main__":
+    main()
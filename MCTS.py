@@ -0,0 +1,295 @@
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Checkers import *
+from BatchCheckers import BatchCheckers
+
+DEFAULT_EXPLORATION = math.sqrt(2)
+DEFAULT_ROLLOUT_PLIES = 200
+
+# Reward of a playout for the player who made a move: a rollout that reaches its ply limit counts as a draw
+WIN_REWARD, DRAW_REWARD, LOSS_REWARD = 1.0, 0.5, 0.0
+
+
+class MCTSNode:
+    """
+    Represents a position in the search tree, reached by playing move from its parent. Its value is the sum of
+    the playout rewards for the player who made the move, known by color index.
+    """
+
+    __slots__ = ("_move", "_parent", "_color_index", "_children", "_untried_moves", "_visits", "_value")
+
+    def __init__(self, move, parent, color_index, untried_moves):
+        self._move = move
+        self._parent = parent
+        self._color_index = color_index
+        self._children = []
+        self._untried_moves = untried_moves
+        self._visits = 0
+        self._value = 0.0
+
+    def get_move(self):
+        """Retrieve the move leading to the node"""
+        return self._move
+
+    def get_children(self):
+        """Retrieve the expanded child nodes"""
+        return self._children
+
+    def get_visits(self):
+        """Retrieve the number of playouts through the node"""
+        return self._visits
+
+    def get_value(self):
+        """Retrieve the sum of the playout rewards for the player who made the move"""
+        return self._value
+
+    def select_child(self, exploration):
+        """Return the child with the highest UCT score"""
+        log_visits = math.log(self._visits)
+        best_child = None
+        best_score = -1.0
+        for child in self._children:
+            score = child._value / child._visits + exploration * math.sqrt(log_visits / child._visits)
+            if score > best_score:
+                best_child = child
+                best_score = score
+        return best_child
+
+
+class MCTS:
+    """
+    Represents a Monte Carlo tree search agent using UCT, playing through the legal_moves, make_move and
+    unmake_move methods of a Checkers game. Rollouts are random games played one at a time, or batch_size at a
+    time on a BatchCheckers (leaf parallelism, with a virtual loss keeping the leaves apart). With more than one
+    worker, each worker process grows its own tree from the position and their root statistics are summed
+    (root parallelism).
+    """
+
+    def __init__(self, exploration=DEFAULT_EXPLORATION, workers=1, batch_size=0,
+                 max_rollout_plies=DEFAULT_ROLLOUT_PLIES, seed=None):
+        self._exploration = exploration
+        self._workers = workers
+        self._batch_size = batch_size
+        self._max_rollout_plies = max_rollout_plies
+        self._rng = random.Random(seed)
+        self._executor = None
+        self._batch = None
+        self._playouts = 0
+        self._elapsed = 0.0
+        self._root_statistics = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_playouts(self):
+        """Retrieve the number of playouts of the last search, across every worker"""
+        return self._playouts
+
+    def get_playouts_per_second(self):
+        """Retrieve the search speed of the last search"""
+        if self._elapsed == 0:
+            return 0.0
+        return self._playouts / self._elapsed
+
+    def get_root_statistics(self):
+        """Retrieve the (move, visits, value) of every root move of the last search, most visited first"""
+        return self._root_statistics
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def best_move(self, game, time_ms=None, playouts=None):
+        """Search until the time budget (in milliseconds) runs out or the number of playouts is reached, whichever
+        comes first, and return the most visited root move. One of the two limits is required"""
+        if time_ms is None and playouts is None:
+            raise ValueError("best_move needs a time budget or a number of playouts.")
+        start_time = time.perf_counter()
+        self._playouts = 0
+        self._root_statistics = []
+
+        moves = game.legal_moves()
+        if len(moves) <= 1:
+            self._elapsed = time.perf_counter() - start_time
+            return moves[0] if moves else None
+
+        if self._workers > 1:
+            self._root_statistics = self.search_parallel(game, time_ms, playouts)
+        else:
+            deadline = None if time_ms is None else start_time + time_ms / 1000
+            self._root_statistics = self.search(game, deadline, playouts)
+        self._root_statistics.sort(key=lambda statistics: statistics[1], reverse=True)
+        self._elapsed = time.perf_counter() - start_time
+
+        # A budget too small for a single playout leaves no statistics, fall back to the first legal move
+        if not self._root_statistics:
+            return moves[0]
+        return self._root_statistics[0][0]
+
+    def search_parallel(self, game, time_ms, playouts):
+        """Grow one tree per worker process and return the summed (move, visits, value) root statistics"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers)
+        worker_playouts = None if playouts is None else -(-playouts // self._workers)
+        snapshot = game.to_bytes()
+        futures = [self._executor.submit(search_worker, snapshot, time_ms, worker_playouts, self._exploration,
+                                         self._batch_size, self._max_rollout_plies, self._rng.getrandbits(64))
+                   for _ in range(self._workers)]
+
+        totals = {}
+        for future in futures:
+            worker_statistics, worker_playout_count = future.result()
+            self._playouts += worker_playout_count
+            for move, visits, value in worker_statistics:
+                total = totals.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += value
+        return [(move, visits, value) for move, (visits, value) in totals.items()]
+
+    def search(self, game, deadline, playouts):
+        """Grow a tree from the position until the deadline (a perf_counter time) or the number of playouts, and
+        return the (move, visits, value) root statistics"""
+        root = MCTSNode(None, None, None, game.legal_moves())
+        batch_size = self._batch_size
+        if batch_size and (self._batch is None or self._batch.get_game_count() != batch_size):
+            self._batch = BatchCheckers(batch_size, self._max_rollout_plies)
+
+        while ((playouts is None or self._playouts < playouts)
+               and (deadline is None or time.perf_counter() < deadline)):
+            if batch_size:
+                count = batch_size if playouts is None else min(batch_size, playouts - self._playouts)
+                self.run_batch(root, game, count)
+                self._playouts += count
+            else:
+                leaf, records = self.select_leaf(root, game)
+                winner = self.rollout(game)
+                for record in reversed(records):
+                    game.unmake_move(record)
+                self.backpropagate(leaf, winner)
+                self._playouts += 1
+
+        return [(child.get_move(), child.get_visits(), child.get_value()) for child in root.get_children()]
+
+    def select_leaf(self, root, game):
+        """Walk down the tree by UCT from the root, expand one untried move, and return the new leaf with the
+        make_move records of the path, leaving the game at the leaf. Every node on the path is counted as visited
+        right away, a virtual loss until backpropagate adds the reward"""
+        node = root
+        node._visits += 1
+        records = []
+        while not node._untried_moves and node._children:
+            node = node.select_child(self._exploration)
+            node._visits += 1
+            records.append(game.make_move(node._move))
+
+        if node._untried_moves:
+            untried_moves = node._untried_moves
+            move = untried_moves.pop(self._rng.randrange(len(untried_moves)))
+            color_index = COLOR_INDEX[game.get_player_turn()]
+            records.append(game.make_move(move))
+            child = MCTSNode(move, node, color_index, game.legal_moves())
+            child._visits += 1
+            node._children.append(child)
+            node = child
+        return node, records
+
+    def rollout(self, game):
+        """Play random moves from the position and return the color index of the winner, or None if the ply limit
+        is reached first. The game is restored before returning"""
+        rng = self._rng
+        records = []
+        winner = None
+        for _ in range(self._max_rollout_plies):
+            if game.is_lost():
+                winner = 1 - COLOR_INDEX[game.get_player_turn()]
+                break
+            moves = game.legal_moves()
+            records.append(game.make_move(moves[rng.randrange(len(moves))]))
+        for record in reversed(records):
+            game.unmake_move(record)
+        return winner
+
+    def run_batch(self, root, game, count):
+        """Select count leaves, play one random rollout from each on the BatchCheckers and backpropagate them"""
+        leaves = []
+        positions = []
+        for _ in range(count):
+            leaf, records = self.select_leaf(root, game)
+            leaves.append(leaf)
+            positions.append((game.get_bitboards(), COLOR_INDEX[game.get_player_turn()],
+                              game.get_continuation_square()))
+            for record in reversed(records):
+                game.unmake_move(record)
+
+        batch = self._batch
+        batch.set_positions(positions)
+        rng = np.random.default_rng(self._rng.getrandbits(64))
+        while not batch.all_done():
+            batch.step(batch.random_moves(rng))
+        winners = batch.get_winners()
+        for index, leaf in enumerate(leaves):
+            self.backpropagate(leaf, None if winners[index] < 0 else int(winners[index]))
+
+    def backpropagate(self, node, winner):
+        """Add the reward of a playout won by the winner color index (None for a draw) to every node from the
+        leaf up to the root, their visits being counted already"""
+        while node is not None:
+            if node._color_index is not None:
+                if winner is None:
+                    node._value += DRAW_REWARD
+                elif winner == node._color_index:
+                    node._value += WIN_REWARD
+                else:
+                    node._value += LOSS_REWARD
+            node = node._parent
+
+
+def search_worker(snapshot, time_ms, playouts, exploration, batch_size, max_rollout_plies, seed):
+    """Grow a tree in a worker process from a game snapshot and return its root statistics and playout count"""
+    start_time = time.perf_counter()
+    mcts = MCTS(exploration, 1, batch_size, max_rollout_plies, seed)
+    deadline = None if time_ms is None else start_time + time_ms / 1000
+    root_statistics = mcts.search(Checkers.from_bytes(snapshot), deadline, playouts)
+    return root_statistics, mcts.get_playouts()
+
+
+def best_move(game, time_ms=None, playouts=None, workers=1):
+    """Return the most visited move for the side to move of a fresh MCTS within the limits"""
+    with MCTS(workers=workers) as mcts:
+        return mcts.best_move(game, time_ms, playouts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the starting position with Monte Carlo tree search.")
+    parser.add_argument("--time-ms", type=float, default=2000, help="time budget of the search")
+    parser.add_argument("--playouts", type=int, default=None, help="playouts of the search at most")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (root parallelism)")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="rollouts played together on a BatchCheckers (default: one at a time)")
+    parser.add_argument("--exploration", type=float, default=DEFAULT_EXPLORATION, help="UCT exploration constant")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    game = Checkers()
+    game.create_player("Lucy", "Black")
+    game.create_player("Adam", "White")
+    with MCTS(args.exploration, args.workers, args.batch_size, seed=args.seed) as mcts:
+        move = mcts.best_move(game, args.time_ms, args.playouts)
+        print(f"best move: {move}  playouts: {mcts.get_playouts()}  "
+              f"speed: {mcts.get_playouts_per_second():.0f} playouts/s")
+        for root_move, visits, value in mcts.get_root_statistics():
+            print(f"  {root_move}: {visits} visits, {value / visits:.3f} mean reward")
+
+
+if __name__ == "__main__":
+    main()
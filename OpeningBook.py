@@ -0,0 +1,178 @@
+import argparse
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from Checkers import *
+from GameArchive import GameArchive, ARCHIVE_MAGIC
+from GameRecord import GameRecordReader, decode_move, MOVE_SQUARES, RESULT_DRAW
+
+# A book file starts with the magic bytes, a format version and the number of entries, followed by one array per
+# field, every array sorted by position hash. An entry is one move played from one position
+BOOK_MAGIC = b"SCOB"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<4sB3xQ")
+BOOK_FIELDS = (("hashes", "Q"), ("moves", "H"), ("counts", "I"), ("wins", "I"), ("draws", "I"), ("losses", "I"))
+DEFAULT_BOOK_PATH = "openings.scob"
+DEFAULT_BOOK_PLIES = 12
+
+# Opening books opened by get_shared_book in this process, by path
+_shared_books = {}
+
+
+class OpeningBook:
+    """
+    Represents an opening book of the moves played from each position of the first plies of many games, with how
+    often each one was played and how those games ended for the player who played it. The file is only read on
+    the first lookup.
+    """
+
+    def __init__(self, book_path):
+        self._book_path = book_path
+        self._fields = None
+
+    def load(self):
+        """Read the book file into one array per field, unless it is already loaded"""
+        if self._fields is not None:
+            return
+        with open(self._book_path, "rb") as book_file:
+            magic, version, entry_count = BOOK_HEADER.unpack(book_file.read(BOOK_HEADER.size))
+            if magic != BOOK_MAGIC or version != BOOK_VERSION:
+                raise ValueError(f"{self._book_path} is not a version {BOOK_VERSION} opening book.")
+            fields = {}
+            for name, typecode in BOOK_FIELDS:
+                values = array(typecode)
+                values.fromfile(book_file, entry_count)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                fields[name] = values
+        self._fields = fields
+
+    def get_entry_count(self):
+        """Retrieve the number of (position, move) entries"""
+        self.load()
+        return len(self._fields["hashes"])
+
+    def get_entries(self, game):
+        """Return the (move, count, wins, draws, losses) book entries of the position, most played first"""
+        self.load()
+        fields = self._fields
+        hashes = fields["hashes"]
+        position_hash = game.get_hash()
+        entry = bisect_left(hashes, position_hash)
+
+        entries = []
+        while entry < len(hashes) and hashes[entry] == position_hash:
+            entries.append((decode_move(fields["moves"][entry]), fields["counts"][entry], fields["wins"][entry],
+                            fields["draws"][entry], fields["losses"][entry]))
+            entry += 1
+        entries.sort(key=lambda book_entry: book_entry[1], reverse=True)
+        return entries
+
+    def book_move(self, game, rng=None, min_count=1):
+        """Return the most played book move of the position, or a move drawn at random in proportion to how often
+        it was played if rng (a random.Random) is given, or None if the position is not in the book"""
+        entries = [book_entry for book_entry in self.get_entries(game) if book_entry[1] >= min_count]
+        if not entries:
+            return None
+        if rng is None:
+            return entries[0][0]
+        return rng.choices([book_entry[0] for book_entry in entries],
+                           weights=[book_entry[1] for book_entry in entries])[0]
+
+
+def get_shared_book(book_path=DEFAULT_BOOK_PATH):
+    """Return this process's opening book of the book file, so that it is only read once per process however many
+    engines play from it"""
+    book = _shared_books.get(book_path)
+    if book is None:
+        book = _shared_books[book_path] = OpeningBook(book_path)
+    return book
+
+
+def book_move(game, book_path=DEFAULT_BOOK_PATH, rng=None, min_count=1):
+    """Return the book move of the position from the book file, loaded once per process, or None"""
+    return get_shared_book(book_path).book_move(game, rng, min_count)
+
+
+def iter_game_records(paths):
+    """Yield the GameRecord of every game in game archives and game record files"""
+    for path in paths:
+        with open(path, "rb") as game_file:
+            is_archive = game_file.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+        if is_archive:
+            with GameArchive(path) as archive:
+                yield from archive
+        else:
+            with open(path, "rb") as record_file:
+                yield from GameRecordReader(record_file)
+
+
+def build_book(book_path, records, plies=DEFAULT_BOOK_PLIES, min_count=1):
+    """Replay the first plies of every GameRecord through play_game, count each move played from each position
+    and how the game ended for the player who played it, and write the book. Moves played fewer than min_count
+    times are left out. Return the number of games used and of entries written, a game with an illegal move is
+    skipped"""
+    statistics = {}
+    game_count = 0
+    for record in records:
+        result = record.get_result()
+        game = record.create_game()
+        positions = []
+        try:
+            for move_code in record.get_move_codes()[:plies]:
+                color_index = COLOR_INDEX[game.get_player_turn()]
+                positions.append((game.get_hash(), move_code & MOVE_SQUARES, color_index))
+                starting_sq_loc, destination_sq_loc = decode_move(move_code)
+                game.play_game(game.get_current_player_name(), starting_sq_loc, destination_sq_loc)
+        except (OutofTurn, InvalidSquare, InvalidPlayer):
+            continue
+
+        game_count += 1
+        for position_hash, move_code, color_index in positions:
+            counts = statistics.get((position_hash, move_code))
+            if counts is None:
+                counts = statistics[(position_hash, move_code)] = [0, 0, 0, 0]
+            counts[0] += 1
+            if result == color_index:
+                counts[1] += 1
+            elif result == RESULT_DRAW:
+                counts[2] += 1
+            elif result == 1 - color_index:
+                counts[3] += 1
+
+    fields = {name: array(typecode) for name, typecode in BOOK_FIELDS}
+    for (position_hash, move_code), (count, wins, draws, losses) in sorted(statistics.items()):
+        if count < min_count:
+            continue
+        fields["hashes"].append(position_hash)
+        fields["moves"].append(move_code)
+        fields["counts"].append(count)
+        fields["wins"].append(wins)
+        fields["draws"].append(draws)
+        fields["losses"].append(losses)
+
+    entry_count = len(fields["hashes"])
+    with open(book_path, "wb") as book_file:
+        book_file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, entry_count))
+        for name, _ in BOOK_FIELDS:
+            if sys.byteorder == "big":
+                fields[name].byteswap()
+            fields[name].tofile(book_file)
+    return game_count, entry_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book from game archives and record files.")
+    parser.add_argument("games", nargs="+", help="game archive or game record files")
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH, help="opening book file to write")
+    parser.add_argument("--plies", type=int, default=DEFAULT_BOOK_PLIES, help="plies of each game to use")
+    parser.add_argument("--min-count", type=int, default=1, help="times a move must be played to be kept")
+    args = parser.parse_args()
+
+    game_count, entry_count = build_book(args.output, iter_game_records(args.games), args.plies, args.min_count)
+    print(f"Built {args.output} from {game_count} games: {entry_count} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import copy
+import random
+import sys
+import time
+from Checkers import *
+
+# Reference positions as (pieces, color to move), None for the starting position
+REFERENCE_POSITIONS = {
+    "start": (None, "Black"),
+    "kings": ((((0, 1), "B K"), ((7, 0), "BTK"), ((2, 3), " W "), ((4, 3), "W K"), ((5, 6), " W "),
+               ((3, 6), " B ")), "Black"),
+    "triple_kings": ((((7, 0), "BTK"), ((5, 2), " B "), ((3, 4), " W "), ((2, 5), "W K"), ((0, 7), "WTK"),
+                      ((6, 5), " W "), ((4, 1), "B K")), "White"),
+    "multi_jump": ((((5, 0), " B "), ((4, 1), " W "), ((2, 3), " W "), ((2, 5), " W "), ((6, 7), " B "),
+                    ((1, 0), " W ")), "Black"),
+    "promotion": ((((1, 2), " B "), ((6, 5), " W "), ((7, 2), "B K"), ((0, 3), "W K"), ((3, 4), " B "),
+                   ((4, 1), " W ")), "Black"),
+}
+
+# Expected perft node count of each reference position at depth 1, 2, ..., a jump continuation being a ply of its own
+REFERENCE_COUNTS = {
+    "start": (7, 49, 379, 2872, 23582, 189143),
+    "kings": (12, 70, 824, 4529, 54184, 311548),
+    "triple_kings": (11, 77, 811, 6399, 71633),
+    "multi_jump": (2, 7, 20, 93, 237, 1190, 3504),
+    "promotion": (5, 36, 208, 1453, 9659, 68743),
+}
+
+
+def create_reference_position(name):
+    """Create a game set up at a reference position"""
+    game = Checkers()
+    game.create_player("Lucy", "Black")
+    game.create_player("Adam", "White")
+    pieces, player_turn = REFERENCE_POSITIONS[name]
+    if pieces is not None:
+        game.clear_board()
+        for square_location, checker_piece in pieces:
+            game.set_piece(square_location, checker_piece)
+    game.set_position(game.get_bitboards(), player_turn)
+    return game
+
+
+def perft(game, depth):
+    """Return the number of move sequences of depth plies from the position, playing every legal move with
+    make_move and unmake_move"""
+    if depth == 0:
+        return 1
+    moves = game.legal_moves()
+    if depth == 1:
+        return len(moves)
+
+    node_count = 0
+    for move in moves:
+        record = game.make_move(move)
+        node_count += perft(game, depth - 1)
+        game.unmake_move(record)
+    return node_count
+
+
+def divide(game, depth):
+    """Return the perft node count below each legal move of the position, as (move, node count) pairs"""
+    counts = []
+    for move in game.legal_moves():
+        record = game.make_move(move)
+        counts.append((move, perft(game, depth - 1)))
+        game.unmake_move(record)
+    return counts
+
+
+def play_game_successors(game):
+    """Return the (move, game copy after the move) pairs of every pair of squares on a diagonal that play_game
+    accepts on a copy of the game, which only succeeds for a legal move"""
+    successors = []
+    player_name = game.get_current_player_name()
+    for start_square in range(32):
+        for ray in DIAGONAL_RAYS[start_square]:
+            for destination_square in ray:
+                move = (SQUARE_COORD[start_square], SQUARE_COORD[destination_square])
+                game_copy = copy.deepcopy(game)
+                try:
+                    game_copy.play_game(player_name, *move)
+                except (OutofTurn, InvalidSquare, InvalidPlayer):
+                    continue
+                successors.append((move, game_copy))
+    return successors
+
+
+def perft_play_game(game, depth):
+    """Return the perft node count by playing every move through play_game on copies of the game. Much slower,
+    used to check the move generator"""
+    if depth == 0:
+        return 1
+    return sum(perft_play_game(game_copy, depth - 1) for _, game_copy in play_game_successors(game))
+
+
+def check_reference_positions(max_depth=None, slow_depth=2, report=print):
+    """Compare perft with the expected node counts of every reference position, and with play_game up to
+    slow_depth, and return True if they all match"""
+    all_match = True
+    for name, expected_counts in REFERENCE_COUNTS.items():
+        game = create_reference_position(name)
+        for depth, expected_count in enumerate(expected_counts[:max_depth], 1):
+            node_count = perft(game, depth)
+            slow_count = perft_play_game(game, depth) if depth <= slow_depth else node_count
+            match = node_count == expected_count == slow_count
+            all_match = all_match and match
+            if report is not None:
+                report(f"{name} depth {depth}: {node_count} nodes, expected {expected_count}"
+                       + ("" if depth > slow_depth else f", play_game {slow_count}")
+                       + ("" if match else "  MISMATCH"))
+    return all_match
+
+
+def iter_self_check_positions(game_count, seed=0, max_plies=150):
+    """Yield the positions of game_count random games, the same game object at every ply. Even games start from
+    the starting position, odd games from random pieces on random squares, so that kings, triple kings and jump
+    continuations come up early"""
+    rng = random.Random(seed)
+    for game_index in range(game_count):
+        game = Checkers()
+        game.create_player("Lucy", "Black")
+        game.create_player("Adam", "White")
+        if game_index % 2:
+            game.clear_board()
+            for square in rng.sample(range(32), rng.randrange(2, 13)):
+                game.set_piece(SQUARE_COORD[square], rng.choice(PIECE_SYMBOLS))
+            game.set_position(game.get_bitboards(), rng.choice(COLORS))
+
+        for _ in range(max_plies):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            yield game
+            game.make_move(rng.choice(moves))
+
+
+def check_legal_moves(game):
+    """Return a list of the differences between legal_moves and the moves play_game accepts in the position"""
+    legal_moves = set(game.legal_moves())
+    play_game_moves = {move for move, _ in play_game_successors(game)}
+    return ([f"legal_moves only: {move}" for move in sorted(legal_moves - play_game_moves)]
+            + [f"play_game only: {move}" for move in sorted(play_game_moves - legal_moves)])
+
+
+def get_incremental_state(game):
+    """Return the hash, piece counts and scores the game keeps up to date move by move"""
+    return (game.get_hash(), [game.get_piece_count(piece) for piece in range(len(PIECE_SYMBOLS))],
+            game.get_material_score(), game.get_positional_score())
+
+
+def check_make_unmake(game):
+    """Return a list of the problems of make_move and unmake_move over the legal moves of the position: the
+    incremental state after make_move must match the state computed from scratch, and unmake_move must restore
+    the position exactly"""
+    problems = []
+    snapshot = game.to_bytes()
+    state = get_incremental_state(game)
+    for move in game.legal_moves():
+        record = game.make_move(move)
+        # from_bytes computes the hash and the material from scratch
+        if get_incremental_state(game) != get_incremental_state(Checkers.from_bytes(game.to_bytes())):
+            problems.append(f"make_move {move} left an incremental state that differs from scratch")
+        game.unmake_move(record)
+        if game.to_bytes() != snapshot or get_incremental_state(game) != state:
+            # The rest of the moves would be made from a wrong position
+            problems.append(f"unmake_move {move} did not restore the position")
+            break
+    return problems
+
+
+def make_capture_move(game, move, color_index):
+    """Make the move and return its undo record with the square locations it captured in jump order, or undo it
+    and return None if it captured nothing"""
+    opponent_mask = game.get_color_mask(1 - color_index)
+    record = game.make_move(move)
+    captured_mask = opponent_mask & ~game.get_color_mask(1 - color_index)
+    if not captured_mask:
+        game.unmake_move(record)
+        return None
+    captured = sorted((SQUARE_COORD[square] for square in range(32) if captured_mask >> square & 1),
+                      key=lambda sq_loc: abs(sq_loc[0] - move[0][0]))
+    return record, captured
+
+
+def make_move_capture_sequences(game, color_index=None, path=None, captured=None):
+    """Return every complete capture sequence for the side to move as (path, captured) pairs like
+    capture_sequences, found by making every capturing move and every jump continuation after it with make_move"""
+    if color_index is None:
+        color_index = COLOR_INDEX[game.get_player_turn()]
+    elif game.get_continuation_square() is None or COLOR_INDEX[game.get_player_turn()] != color_index:
+        return [(tuple(path), tuple(captured))]
+
+    sequences = []
+    for move in game.legal_moves():
+        capture = make_capture_move(game, move, color_index)
+        if capture is not None:
+            record, jumped = capture
+            sequences += make_move_capture_sequences(game, color_index, (path or [move[0]]) + [move[1]],
+                                                     (captured or []) + jumped)
+            game.unmake_move(record)
+    return sequences
+
+
+def check_capture_sequences(game):
+    """Return a list of the differences between capture_sequences and the sequences found with make_move, and of
+    the sequences make_capture_sequence and unmake_move do not play back exactly"""
+    sequences = game.capture_sequences()
+    make_move_sequences = make_move_capture_sequences(game)
+    problems = ([f"capture_sequences only: {sequence}" for sequence in set(sequences) - set(make_move_sequences)]
+                + [f"make_move only: {sequence}" for sequence in set(make_move_sequences) - set(sequences)])
+    if len(sequences) != len(set(sequences)):
+        problems.append("capture_sequences returned a sequence twice")
+
+    snapshot = game.to_bytes()
+    for path, _ in sequences:
+        record = game.make_capture_sequence(path)
+        if game.get_continuation_square() is not None:
+            problems.append(f"make_capture_sequence {path} left a jump continuation pending")
+        game.unmake_move(record)
+        if game.to_bytes() != snapshot:
+            problems.append(f"unmake_move of make_capture_sequence {path} did not restore the position")
+            break
+    return problems
+
+
+# Checks of the self-check mode, each taking a position and returning a list of the problems found in it
+SELF_CHECKS = {
+    "legal_moves": check_legal_moves,
+    "make_unmake": check_make_unmake,
+    "capture_sequences": check_capture_sequences,
+}
+
+
+def self_check(game_count, seed=0, report=print):
+    """Run every self-check over the positions of game_count random games and return True if they all pass"""
+    failures = {name: 0 for name in SELF_CHECKS}
+    position_count = 0
+    for game in iter_self_check_positions(game_count, seed):
+        position_count += 1
+        for name, check in SELF_CHECKS.items():
+            problems = check(game)
+            if problems:
+                failures[name] += 1
+                if report is not None and failures[name] <= 5:
+                    report(f"{name} failed at {game.get_board()}, {game.get_player_turn()} to move: "
+                           + "; ".join(problems))
+    if report is not None:
+        for name, failure_count in failures.items():
+            report(f"{name}: {position_count} positions, {failure_count} failed")
+    return not any(failures.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count move sequences to check the Super-Checkers move generator.")
+    parser.add_argument("position", nargs="?", default=None, help="reference position (default: check them all)")
+    parser.add_argument("--depth", type=int, default=4, help="depth of the count for a single position")
+    parser.add_argument("--divide", action="store_true", help="split the count by the first move")
+    parser.add_argument("--slow-depth", type=int, default=2, help="depth up to which play_game is checked too")
+    parser.add_argument("--self-check", type=int, metavar="GAMES", default=None,
+                        help="check the move generator against play_game over the positions of random games")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the self-check games")
+    args = parser.parse_args()
+
+    if args.self_check is not None:
+        if not self_check(args.self_check, args.seed):
+            print("self-check FAILED")
+            sys.exit(1)
+        print("self-check passed")
+        return
+    if args.position is None:
+        print("all match" if check_reference_positions(slow_depth=args.slow_depth) else "MISMATCH")
+        return
+
+    game = create_reference_position(args.position)
+    start_time = time.perf_counter()
+    if args.divide:
+        counts = divide(game, args.depth)
+        for move, node_count in counts:
+            print(f"{move}: {node_count}")
+        node_count = sum(node_count for _, node_count in counts)
+    else:
+        node_count = perft(game, args.depth)
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.position} depth {args.depth}: {node_count} nodes in {elapsed:.2f} s "
+          f"({node_count / elapsed:.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    main()
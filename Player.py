@@ -4,6 +4,8 @@ class Player:
     and captured pieces count.
     """
 
+    __slots__ = ("_player_name", "_piece_color", "_king_count", "_triple_king_count", "_captured_pieces_count")
+
     def __init__(self, player_name, piece_color):
         self._player_name = player_name
         self._piece_color = piece_color
@@ -23,6 +25,10 @@ class Player:
         """Retrieve the number of king the player owns"""
         return self._king_count
 
+    def set_king_count(self, count):
+        """Set the number of king the player owns"""
+        self._king_count = count
+
     def increment_king_count(self):
         """Increment the number of king the player owns by 1"""
         self._king_count += 1
@@ -35,6 +41,10 @@ class Player:
         """Retrieve the number of triple king the player owns"""
         return self._triple_king_count
 
+    def set_triple_king_count(self, count):
+        """Set the number of triple king the player owns"""
+        self._triple_king_count = count
+
     def increment_triple_king_count(self):
         """Increment the number of triple king the player owns by 1"""
         self._triple_king_count += 1
@@ -47,6 +57,10 @@ class Player:
         """Retrieve the number of opponent pieces the player captured"""
         return self._captured_pieces_count
 
+    def set_captured_pieces_count(self, count):
+        """Set the number of opponent pieces the player captured"""
+        self._captured_pieces_count = count
+
     def increment_captured_pieces_count(self, num):
         """Increment the number of captured piece by the number of pieces captured at one round"""
         self._captured_pieces_count += num
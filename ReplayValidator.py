@@ -0,0 +1,170 @@
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Checkers import *
+from GameRecord import GameRecordReader, FILE_MAGIC, decode_move, InvalidRecord
+
+# Verdict of each move: played, rejected by play_game, not parsable, or skipped until the next game boundary
+OK = "ok"
+OUT_OF_TURN = "OutofTurn"
+INVALID_SQUARE = "InvalidSquare"
+INVALID_PLAYER = "InvalidPlayer"
+MALFORMED = "malformed"
+SKIPPED = "skipped"
+VERDICTS = (OK, OUT_OF_TURN, INVALID_SQUARE, INVALID_PLAYER, MALFORMED, SKIPPED)
+
+
+class GameBoundary:
+    """
+    Represents the start of a new game in a move stream, with the names of the Black and White players.
+    """
+
+    def __init__(self, black_name, white_name):
+        self._black_name = black_name
+        self._white_name = white_name
+
+    def get_black_name(self):
+        """Retrieve the name of the player playing Black"""
+        return self._black_name
+
+    def get_white_name(self):
+        """Retrieve the name of the player playing White"""
+        return self._white_name
+
+
+def validate_moves(items):
+    """Feed a stream of GameBoundary objects and (player_name, start, destination) tuples through play_game and
+    yield a (game_index, move_index, verdict, detail) tuple per move. A rejected move does not stop the stream,
+    the rest of its game is skipped and validation resumes at the next game boundary"""
+    game = None
+    game_index = -1
+    move_index = 0
+    in_sync = False
+
+    for item in items:
+        if isinstance(item, GameBoundary):
+            game = Checkers()
+            game.create_player(item.get_black_name(), "Black")
+            game.create_player(item.get_white_name(), "White")
+            game_index += 1
+            move_index = 0
+            in_sync = True
+            continue
+
+        if not in_sync:
+            detail = "no game started" if game is None else "an earlier move of the game was rejected"
+            yield game_index, move_index, SKIPPED, detail
+        elif isinstance(item, InvalidRecord):
+            in_sync = False
+            yield game_index, move_index, MALFORMED, f"InvalidRecord: {item}"
+        else:
+            try:
+                player_name, starting_sq_loc, destination_sq_loc = item
+                game.play_game(player_name, tuple(starting_sq_loc), tuple(destination_sq_loc))
+                yield game_index, move_index, OK, None
+            except OutofTurn as error:
+                in_sync = False
+                yield game_index, move_index, OUT_OF_TURN, str(error)
+            except InvalidSquare as error:
+                in_sync = False
+                yield game_index, move_index, INVALID_SQUARE, str(error)
+            except InvalidPlayer as error:
+                in_sync = False
+                yield game_index, move_index, INVALID_PLAYER, str(error)
+            except (TypeError, ValueError, IndexError, KeyError) as error:
+                in_sync = False
+                yield game_index, move_index, MALFORMED, f"{type(error).__name__}: {error}"
+        move_index += 1
+
+
+def read_move_log(log_file):
+    """Yield the items of a JSON lines move log: {"black": name, "white": name} starts a game, and
+    [player_name, [row, col], [row, col]] is a move. A line that is not valid JSON is passed on as is,
+    so that it gets a malformed verdict"""
+    for line in log_file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield line
+            continue
+        if isinstance(item, dict):
+            yield GameBoundary(item.get("black"), item.get("white"))
+        else:
+            yield item
+
+
+def record_moves(record):
+    """Yield the items of a GameRecord, its game boundary then one (player_name, start, destination) per ply. The
+    player names come from a shadow game that stops at the first ply play_game rejects, the validator skipping
+    the rest of the game anyway"""
+    yield GameBoundary(*record.get_player_names())
+    game = record.create_game()
+    in_sync = True
+    for move_code in record.get_move_codes():
+        starting_sq_loc, destination_sq_loc = decode_move(move_code)
+        player_name = game.get_current_player_name()
+        yield player_name, starting_sq_loc, destination_sq_loc
+        if in_sync:
+            try:
+                game.play_game(player_name, starting_sq_loc, destination_sq_loc)
+            except (OutofTurn, InvalidSquare, InvalidPlayer, TypeError, ValueError, IndexError, KeyError):
+                in_sync = False
+
+
+def read_record_file(record_file):
+    """Yield the items of every game of a binary game record file. Where the file turns out to be malformed, a
+    game boundary is passed on followed by the InvalidRecord error, so that it gets a malformed verdict of its own"""
+    try:
+        for record in GameRecordReader(record_file):
+            yield from record_moves(record)
+    except InvalidRecord as error:
+        yield GameBoundary("Black", "White")
+        yield error
+
+
+def validate_shard(shard_path, max_rejections=1000):
+    """Validate a JSON lines move log or a game record file and return its path, the count of each verdict and
+    the first max_rejections rejected moves (skipped moves are only counted)"""
+    counts = dict.fromkeys(VERDICTS, 0)
+    rejections = []
+    with open(shard_path, "rb") as shard_file:
+        is_record_file = shard_file.read(len(FILE_MAGIC)) == FILE_MAGIC
+    with open(shard_path, "rb" if is_record_file else "r") as shard_file:
+        items = read_record_file(shard_file) if is_record_file else read_move_log(shard_file)
+        for verdict in validate_moves(items):
+            counts[verdict[2]] += 1
+            if verdict[2] != OK and verdict[2] != SKIPPED and len(rejections) < max_rejections:
+                rejections.append(verdict)
+    return shard_path, counts, rejections
+
+
+def validate_shards(shard_paths, workers=None, max_rejections=1000):
+    """Validate move log shards across a process pool, yielding the result of each shard as it finishes"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(validate_shard, shard_path, max_rejections) for shard_path in shard_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate Super-Checkers move logs.")
+    parser.add_argument("shards", nargs="+", help="JSON lines move logs or game record files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-rejections", type=int, default=20, help="rejected moves listed per shard")
+    args = parser.parse_args()
+
+    totals = dict.fromkeys(VERDICTS, 0)
+    for shard_path, counts, rejections in validate_shards(args.shards, args.workers, args.max_rejections):
+        print(f"{shard_path}: " + ", ".join(f"{verdict} {count}" for verdict, count in counts.items() if count))
+        for game_index, move_index, verdict, detail in rejections:
+            print(f"  game {game_index} move {move_index}: {verdict} {detail or ''}")
+        for verdict, count in counts.items():
+            totals[verdict] += count
+    print("total: " + ", ".join(f"{verdict} {count}" for verdict, count in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import random
+import sqlite3
+import time
+from collections import OrderedDict
+from Checkers import *
+
+DEFAULT_STORE_PATH = "sessions.db"
+
+# Evicted sessions written to the store between two commits, a flush or close always commits
+COMMIT_INTERVAL = 1000
+
+
+class SessionManager:
+    """
+    Represents a set of game sessions keyed by game id, keeping the most recently used games in memory within a
+    session count and memory budget and spilling the others to a sqlite store as Checkers.to_bytes snapshots.
+    A game is read back from the store the next time it is used.
+    """
+
+    def __init__(self, store_path=DEFAULT_STORE_PATH, max_sessions=None, memory_budget=None):
+        self._connection = sqlite3.connect(store_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS sessions (game_id PRIMARY KEY, snapshot BLOB)")
+        self._max_sessions = max_sessions
+        self._memory_budget = memory_budget
+        self._resident = OrderedDict()
+        self._memory_usage = 0
+        self._pending_writes = 0
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Return the number of sessions in memory"""
+        return len(self._resident)
+
+    def get_hit_count(self):
+        """Retrieve the number of lookups answered from memory"""
+        return self._hit_count
+
+    def get_miss_count(self):
+        """Retrieve the number of lookups that read the game back from the store"""
+        return self._miss_count
+
+    def get_eviction_count(self):
+        """Retrieve the number of games spilled to the store to stay within the limits"""
+        return self._eviction_count
+
+    def get_memory_usage(self):
+        """Retrieve the estimated memory in bytes of the games in memory"""
+        return self._memory_usage
+
+    def get_stored_count(self):
+        """Return the number of sessions in the store, which may include stale copies of games in memory"""
+        return self._connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def create_game(self, game_id, black_name, white_name):
+        """Create a game at the starting position, add it as a session and return it"""
+        game = Checkers()
+        game.create_player(black_name, "Black")
+        game.create_player(white_name, "White")
+        self.add_game(game_id, game)
+        return game
+
+    def add_game(self, game_id, game):
+        """Add a game as the most recently used session, replacing any session with the same game id"""
+        self.remove_game(game_id)
+        self.make_resident(game_id, game)
+
+    def get_game(self, game_id):
+        """Return the game of a session, reading it back from the store if it was spilled, and mark it as the most
+        recently used"""
+        entry = self._resident.get(game_id)
+        if entry is not None:
+            self._hit_count += 1
+            self._resident.move_to_end(game_id)
+            return entry[0]
+
+        row = self._connection.execute("SELECT snapshot FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        if row is None:
+            raise UnknownSession(f"Session {game_id} does not exist.")
+        self._miss_count += 1
+        game = Checkers.from_bytes(row[0])
+        self.make_resident(game_id, game)
+        return game
+
+    def play_game(self, game_id, player_name, starting_sq_loc, destination_sq_loc):
+        """Play a move in the game of a session through play_game and return what it returns"""
+        return self.get_game(game_id).play_game(player_name, starting_sq_loc, destination_sq_loc)
+
+    def remove_game(self, game_id):
+        """Remove a session from memory and from the store, if it exists"""
+        entry = self._resident.pop(game_id, None)
+        if entry is not None:
+            self._memory_usage -= entry[1]
+        self._connection.execute("DELETE FROM sessions WHERE game_id = ?", (game_id,))
+
+    def make_resident(self, game_id, game):
+        """Keep a game in memory as the most recently used session, then spill the least recently used ones
+        while over the limits (never the game just added)"""
+        memory_size = game.get_memory_size()
+        self._resident[game_id] = (game, memory_size)
+        self._memory_usage += memory_size
+        while len(self._resident) > 1 and self.is_over_limits():
+            self.evict()
+
+    def is_over_limits(self):
+        """Return True if the games in memory exceed the session count or memory budget"""
+        return ((self._max_sessions is not None and len(self._resident) > self._max_sessions)
+                or (self._memory_budget is not None and self._memory_usage > self._memory_budget))
+
+    def evict(self):
+        """Spill the least recently used game to the store"""
+        game_id, (game, memory_size) = self._resident.popitem(last=False)
+        self._memory_usage -= memory_size
+        self.write_session(game_id, game)
+        self._eviction_count += 1
+
+    def write_session(self, game_id, game):
+        """Write the snapshot of a game to the store, committing every COMMIT_INTERVAL writes"""
+        self._connection.execute("INSERT OR REPLACE INTO sessions (game_id, snapshot) VALUES (?, ?)",
+                                 (game_id, game.to_bytes()))
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def flush(self):
+        """Write every game in memory to the store and commit, keeping them in memory"""
+        for game_id, (game, _) in self._resident.items():
+            self.write_session(game_id, game)
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        """Flush the games in memory and close the store"""
+        self.flush()
+        self._connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play random moves across many sessions of a SessionManager.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="sqlite file the sessions spill to")
+    parser.add_argument("--sessions", type=int, default=10000, help="sessions played")
+    parser.add_argument("--max-sessions", type=int, default=None, help="sessions kept in memory at most")
+    parser.add_argument("--memory-budget", type=int, default=1 << 20, help="bytes of games kept in memory at most")
+    parser.add_argument("--moves", type=int, default=100000, help="moves played in total")
+    parser.add_argument("--hot-fraction", type=float, default=0.1, help="fraction of sessions most moves go to")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hot_sessions = max(1, int(args.sessions * args.hot_fraction))
+    with SessionManager(args.store, args.max_sessions, args.memory_budget) as manager:
+        for game_id in range(args.sessions):
+            manager.create_game(game_id, "Black", "White")
+
+        start_time = time.perf_counter()
+        for _ in range(args.moves):
+            # Nine moves out of ten go to the hot sessions, the rest to any session
+            game_id = rng.randrange(hot_sessions if rng.random() < 0.9 else args.sessions)
+            game = manager.get_game(game_id)
+            moves = game.legal_moves()
+            if not moves:
+                manager.create_game(game_id, "Black", "White")
+                continue
+            game.play_game(game.get_current_player_name(), *rng.choice(moves))
+        elapsed = time.perf_counter() - start_time
+
+        print(f"{args.moves} moves in {elapsed:.2f} s ({elapsed / args.moves * 1e6:.1f} us/move): "
+              f"{manager.get_hit_count()} hits, {manager.get_miss_count()} misses, "
+              f"{manager.get_eviction_count()} evictions, {len(manager)} sessions in memory using "
+              f"{manager.get_memory_usage()} bytes")
+
+
+class UnknownSession(Exception):
+    """Exception raised when a game id is neither in memory nor in the store"""
+    pass
+
+
+if __name__ == "__main__":
+    main()
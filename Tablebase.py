@@ -0,0 +1,354 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations, combinations_with_replacement
+from math import comb
+from Checkers import *
+
+# A tablebase file starts with the magic bytes, a format version, the largest number of pieces and the number of
+# material signatures, then one directory entry per signature (its piece counts per class and the offset of its
+# table), then the tables. A signature's table holds one 16-bit entry per position index
+TABLEBASE_MAGIC = b"SCTB"
+TABLEBASE_VERSION = 4
+TABLEBASE_HEADER = struct.Struct("<4sBBH")
+SIGNATURE_ENTRY = struct.Struct("<6B2xQ")
+TABLE_ENTRY = struct.Struct("<H")
+DEFAULT_TABLEBASE_PATH = "tablebase.sctb"
+
+# Entry codes: 0 for a position that was not solved, 1 for a draw, 2 + 2d for a win in d plies
+# and 3 + 2d for a loss in d plies, from the point of view of the side to move
+NO_ENTRY = 0
+DRAW_ENTRY = 1
+
+# Results returned by probe, with the distance in plies (a jump continuation counts as a ply)
+WIN, LOSS, DRAW = "win", "loss", "draw"
+
+# Values used while solving, win in d plies is WIN_VALUE - d, loss in d plies is d - WIN_VALUE and draw is 0,
+# so that the best move always has the highest value
+WIN_VALUE = 30000
+
+# Binomial coefficients C(n, k) for n and k up to 32, to rank the squares of a piece class among the free squares
+BINOMIALS = tuple(tuple(comb(n, k) for k in range(33)) for n in range(33))
+
+# Tablebases opened by probe in this process, by path
+_shared_tablebases = {}
+
+
+class Tablebase:
+    """
+    Represents a read-only, memory-mapped endgame tablebase, answering the exact result of any position with
+    up to get_max_pieces() pieces.
+    """
+
+    def __init__(self, tablebase_path):
+        with open(tablebase_path, "rb") as tablebase_file:
+            self._mmap = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._max_pieces, signature_count = TABLEBASE_HEADER.unpack_from(self._mmap)
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{tablebase_path} is not a version {TABLEBASE_VERSION} tablebase.")
+
+        self._offsets = {}
+        for entry in range(signature_count):
+            *signature, offset = SIGNATURE_ENTRY.unpack_from(
+                self._mmap, TABLEBASE_HEADER.size + entry * SIGNATURE_ENTRY.size)
+            self._offsets[tuple(signature)] = offset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_max_pieces(self):
+        """Retrieve the largest number of pieces on the board the tablebase covers"""
+        return self._max_pieces
+
+    def get_signatures(self):
+        """Retrieve the material signatures (piece counts per class) in the tablebase"""
+        return list(self._offsets)
+
+    def get_entry(self, signature, index):
+        """Return the entry code of a position index of a signature, or None if the signature is not stored"""
+        offset = self._offsets.get(signature)
+        if offset is None:
+            return None
+        return TABLE_ENTRY.unpack_from(self._mmap, offset + index * TABLE_ENTRY.size)[0]
+
+    def probe_value(self, game):
+        """Return the value of the position for the side to move, or None if it is not covered"""
+        if game.get_color_piece_count(0) + game.get_color_piece_count(1) > self._max_pieces:
+            return None
+        return probe_value(game, self.get_entry)
+
+    def probe(self, game):
+        """Return the (WIN, LOSS or DRAW, distance in plies) result of the position for the side to move,
+        or None if it is not covered"""
+        value = self.probe_value(game)
+        if value is None:
+            return None
+        return value_to_result(value)
+
+    def close(self):
+        """Unmap the tablebase"""
+        self._mmap.close()
+
+
+def probe(game, tablebase_path=DEFAULT_TABLEBASE_PATH):
+    """Return the (WIN, LOSS or DRAW, distance in plies) result of the position for the side to move from the
+    tablebase file, mapped once per process, or None if it is not covered"""
+    tablebase = _shared_tablebases.get(tablebase_path)
+    if tablebase is None:
+        tablebase = _shared_tablebases[tablebase_path] = Tablebase(tablebase_path)
+    return tablebase.probe(game)
+
+
+def get_signature(game):
+    """Return the material signature of the position, the number of pieces of each piece class"""
+    return tuple(game.get_piece_count(piece) for piece in range(6))
+
+
+def get_position_index(game):
+    """Return the index of the position in its signature's table. Piece class by piece class, as iter_placements
+    places them, the squares of the class are ranked with the combinatorial number system among the squares the
+    earlier classes left free, the ranks being the digits of a mixed radix number; then the color to move"""
+    index = 0
+    occupied_mask = 0
+    free_count = 32
+    for bitboard in game.get_bitboards():
+        piece_count = 0
+        rank = 0
+        remaining = bitboard
+        while remaining:
+            square_bit = remaining & -remaining
+            piece_count += 1
+            free_square = square_bit.bit_length() - 1 - (occupied_mask & (square_bit - 1)).bit_count()
+            rank += BINOMIALS[free_square][piece_count]
+            remaining ^= square_bit
+        index = index * BINOMIALS[free_count][piece_count] + rank
+        occupied_mask |= bitboard
+        free_count -= piece_count
+    return index * 2 + COLOR_INDEX[game.get_player_turn()]
+
+
+def get_table_size(signature):
+    """Return the number of entries of a signature's table, two per placement of its pieces"""
+    table_size = 2
+    free_count = 32
+    for piece_count in signature:
+        table_size *= BINOMIALS[free_count][piece_count]
+        free_count -= piece_count
+    return table_size
+
+
+def encode_value(value):
+    """Return the entry code of a value"""
+    if value > 0:
+        return 2 + 2 * (WIN_VALUE - value)
+    if value < 0:
+        return 3 + 2 * (WIN_VALUE + value)
+    return DRAW_ENTRY
+
+
+def decode_value(code):
+    """Return the value of an entry code"""
+    if code == DRAW_ENTRY:
+        return 0
+    if code & 1:
+        return (code - 3) // 2 - WIN_VALUE
+    return WIN_VALUE - (code - 2) // 2
+
+
+def value_to_result(value):
+    """Return the (WIN, LOSS or DRAW, distance in plies) result of a value"""
+    if value > 0:
+        return WIN, WIN_VALUE - value
+    if value < 0:
+        return LOSS, WIN_VALUE + value
+    return DRAW, 0
+
+
+def add_ply(value):
+    """Return a value one ply further away from the end of the game"""
+    if value > 0:
+        return value - 1
+    if value < 0:
+        return value + 1
+    return 0
+
+
+def probe_value(game, get_entry):
+    """Return the value of the position for the side to move, looking entries up with get_entry(signature, index),
+    or None if a position needed is not stored. A pending jump continuation is not part of the tables, so the
+    jumps the piece has to make are played out until the turn changes hands"""
+    player_turn = game.get_player_turn()
+    if not game.is_jump_continuation_pending(COLOR_INDEX[player_turn]):
+        code = get_entry(get_signature(game), get_position_index(game))
+        if code is None or code == NO_ENTRY:
+            return None
+        return decode_value(code)
+
+    best_value = -WIN_VALUE
+    for move in game.legal_moves():
+        record = game.make_move(move)
+        value = probe_value(game, get_entry)
+        same_turn = game.get_player_turn() == player_turn
+        game.unmake_move(record)
+        if value is None:
+            return None
+        best_value = max(best_value, add_ply(value if same_turn else -value))
+    return best_value
+
+
+def get_signatures(max_pieces):
+    """Return every material signature with 1 to max_pieces pieces, each one after the signatures its positions
+    can lead to: fewer pieces after a capture, or one more promotion (2 per regular piece, 1 per king to go)"""
+    signatures = []
+    for piece_count in range(1, max_pieces + 1):
+        for pieces in combinations_with_replacement(range(6), piece_count):
+            signatures.append(tuple(pieces.count(piece) for piece in range(6)))
+
+    def promotion_potential(signature):
+        return 2 * (signature[BLACK_MAN] + signature[WHITE_MAN]) + signature[BLACK_KING] + signature[WHITE_KING]
+
+    signatures.sort(key=lambda signature: (sum(signature), promotion_potential(signature)))
+    return signatures
+
+
+def iter_placements(signature):
+    """Yield the bitboards of every placement of the signature's pieces on distinct squares"""
+    def place(piece, occupied_mask, bitboards):
+        if piece == 6:
+            yield tuple(bitboards)
+            return
+        free_squares = [square for square in range(32) if not occupied_mask & (1 << square)]
+        for squares in combinations(free_squares, signature[piece]):
+            mask = sum(1 << square for square in squares)
+            bitboards.append(mask)
+            yield from place(piece + 1, occupied_mask | mask, bitboards)
+            bitboards.pop()
+
+    yield from place(0, 0, [])
+
+
+def solve_signature(game, signature, tables):
+    """Solve every position of a signature by retrograde analysis and return its table. The moves of each position
+    are generated once; moves leaving the signature are valued from the solved tables, and results then propagate
+    backwards from the positions with no legal move through the predecessors of each position, in order of
+    distance, so every win is the fastest and every loss the slowest. Positions left unresolved are draws"""
+    def get_entry(entry_signature, index):
+        table = tables.get(entry_signature)
+        return None if table is None else table[index]
+
+    predecessors = {}
+    pending_counts = {}
+    best_values = {}
+    proposals = {}
+    resolved = {}
+
+    def propose(index, value):
+        if value == 0:
+            resolved.setdefault(index, 0)
+        else:
+            proposals.setdefault(WIN_VALUE - abs(value), []).append((index, value))
+
+    for bitboards in iter_placements(signature):
+        for player_turn in COLORS:
+            game.set_position(bitboards, player_turn)
+            index = get_position_index(game)
+            pending_count = 0
+            best_value = None
+
+            for move in game.legal_moves():
+                record = game.make_move(move)
+                if game.get_player_turn() == player_turn:
+                    value = add_ply(probe_value(game, get_entry))
+                elif get_signature(game) == signature:
+                    predecessors.setdefault(get_position_index(game), []).append(index)
+                    pending_count += 1
+                    value = None
+                else:
+                    value = add_ply(-probe_value(game, get_entry))
+                game.unmake_move(record)
+
+                if value is not None and (best_value is None or value > best_value):
+                    best_value = value
+
+            if pending_count == 0:
+                # No move stays in the signature (or no move at all, which loses at once)
+                propose(index, -WIN_VALUE if best_value is None else best_value)
+            else:
+                pending_counts[index] = pending_count
+                best_values[index] = -WIN_VALUE if best_value is None else best_value
+                if best_value is not None and best_value > 0:
+                    propose(index, best_value)
+
+    while proposals:
+        for index, value in proposals.pop(min(proposals)):
+            if index in resolved:
+                continue
+            resolved[index] = value
+            for parent in predecessors.get(index, ()):
+                if parent in resolved:
+                    continue
+                if value < 0:
+                    # Moving into a lost position for the opponent wins
+                    propose(parent, add_ply(-value))
+                else:
+                    # A parent only loses once every move leads to a win for the opponent
+                    pending_counts[parent] -= 1
+                    best_values[parent] = max(best_values[parent], add_ply(-value))
+                    if pending_counts[parent] == 0:
+                        propose(parent, best_values[parent])
+
+    table = array("H", bytes(TABLE_ENTRY.size * get_table_size(signature)))
+    for index in pending_counts:
+        table[index] = DRAW_ENTRY
+    for index, value in resolved.items():
+        table[index] = encode_value(value)
+    return table
+
+
+def generate_tablebase(tablebase_path, max_pieces, report=print):
+    """Solve every signature with up to max_pieces pieces and write the tablebase file"""
+    game = Checkers()
+    game.create_player("Black", "Black")
+    game.create_player("White", "White")
+
+    tables = {}
+    for signature in get_signatures(max_pieces):
+        start_time = time.perf_counter()
+        table = solve_signature(game, signature, tables)
+        tables[signature] = table
+        if report is not None:
+            results = [value_to_result(decode_value(code))[0] for code in table if code != NO_ENTRY]
+            report(f"{','.join(map(str, signature))}: {len(results)} positions, {results.count(WIN)} wins, "
+                   f"{results.count(LOSS)} losses, {results.count(DRAW)} draws "
+                   f"in {time.perf_counter() - start_time:.1f} s")
+
+    with open(tablebase_path, "wb") as tablebase_file:
+        tablebase_file.write(TABLEBASE_HEADER.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, max_pieces, len(tables)))
+        offset = TABLEBASE_HEADER.size + len(tables) * SIGNATURE_ENTRY.size
+        for signature, table in tables.items():
+            tablebase_file.write(SIGNATURE_ENTRY.pack(*signature, offset))
+            offset += len(table) * TABLE_ENTRY.size
+        for table in tables.values():
+            if sys.byteorder == "big":
+                table.byteswap()
+            tablebase_file.write(table.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Super-Checkers endgame tablebase.")
+    parser.add_argument("--pieces", type=int, default=2, help="largest number of pieces on the board")
+    parser.add_argument("--output", default=DEFAULT_TABLEBASE_PATH, help="tablebase file to write")
+    args = parser.parse_args()
+    generate_tablebase(args.output, args.pieces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Author: Anson Poon
+# GitHub username: anson-poon
+# Description: Play many Super-Checkers games between two agents across worker processes
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from Agents import create_agent
+from Checkers import *
+from GameRecord import GameRecordWriter, record_move, RESULT_DRAW
+
+
+def run_game(game_index, agent_a_spec, agent_b_spec, seed, max_plies, book_path=None):
+    """Play one game and return its result. Agent A plays Black in even games and White in odd games,
+    and every random choice comes from a generator seeded by (seed, game_index)"""
+    start_time = time.perf_counter()
+    rng = random.Random(f"{seed}:{game_index}")
+    agent_a = create_agent(agent_a_spec, book_path)
+    agent_b = create_agent(agent_b_spec, book_path)
+    black_agent, white_agent = (agent_a, agent_b) if game_index % 2 == 0 else (agent_b, agent_a)
+
+    game = Checkers()
+    black_player = game.create_player("Black", "Black")
+    white_player = game.create_player("White", "White")
+    agents = {"Black": black_agent, "White": white_agent}
+
+    winner = None
+    plies = 0
+    move_codes = []
+    while plies < max_plies:
+        if game.is_lost():
+            winner = "White" if game.get_player_turn() == "Black" else "Black"
+            break
+        move_codes.append(record_move(game, agents[game.get_player_turn()].choose_move(game, rng)))
+        plies += 1
+
+    return {
+        "game": game_index,
+        "black": black_agent.get_name(),
+        "white": white_agent.get_name(),
+        "winner": winner,
+        "winner_agent": None if winner is None else agents[winner].get_name(),
+        "moves": plies,
+        "black_captured": black_player.get_captured_pieces_count(),
+        "white_captured": white_player.get_captured_pieces_count(),
+        "wall_time": round(time.perf_counter() - start_time, 4),
+        "move_codes": move_codes,
+    }
+
+
+def run_tournament(game_count, agent_a_spec, agent_b_spec, output_path, workers=None, seed=0, max_plies=300,
+                   record_path=None, book_path=None):
+    """Play game_count games across a process pool, appending each result to output_path as a JSON line
+    as soon as its game finishes (and its moves to the binary game record file record_path, if any),
+    and return the number of wins of each agent and of draws"""
+    summary = {"a": 0, "b": 0, "draw": 0}
+    next_game = 0
+    pending = set()
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(output_path, "a") as output_file, \
+            (open(record_path, "wb") if record_path else contextlib.nullcontext()) as record_file:
+        record_writer = GameRecordWriter(record_file) if record_file else None
+        while next_game < game_count or pending:
+            # Keep a bounded number of games in flight so huge tournaments do not queue every future up front
+            while next_game < game_count and len(pending) < max_pending:
+                pending.add(executor.submit(run_game, next_game, agent_a_spec, agent_b_spec, seed, max_plies,
+                                            book_path))
+                next_game += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                move_codes = result.pop("move_codes")
+                if record_writer is not None:
+                    winner = result["winner"]
+                    record_writer.write_game(result["black"], result["white"],
+                                             RESULT_DRAW if winner is None else COLOR_INDEX[winner], move_codes)
+                output_file.write(json.dumps(result) + "\n")
+                if result["winner"] is None:
+                    summary["draw"] += 1
+                elif (result["winner"] == "Black") == (result["game"] % 2 == 0):
+                    summary["a"] += 1
+                else:
+                    summary["b"] += 1
+            output_file.flush()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Super-Checkers games between two agents.")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--agent-a", default="engine:3",
+                        help='"random", "greedy", "engine:<depth>" or "mcts:<playouts>"')
+    parser.add_argument("--agent-b", default="random",
+                        help='"random", "greedy", "engine:<depth>" or "mcts:<playouts>"')
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed, each game is seeded by (seed, game)")
+    parser.add_argument("--max-plies", type=int, default=300, help="moves after which a game is a draw")
+    parser.add_argument("--output", default="tournament.jsonl", help="JSON lines file the results are appended to")
+    parser.add_argument("--record", default=None, help="binary game record file the moves are written to")
+    parser.add_argument("--book", default=None, help="opening book file the engine agents play from")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    summary = run_tournament(args.games, args.agent_a, args.agent_b, args.output, args.workers, args.seed,
+                             args.max_plies, args.record, args.book)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{args.agent_a} won {summary['a']}, {args.agent_b} won {summary['b']}, {summary['draw']} drawn")
+    print(f"{args.games} games in {elapsed:.1f} s ({args.games / elapsed:.1f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
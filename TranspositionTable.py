@@ -0,0 +1,106 @@
+from array import array
+from Checkers import SQUARE_INDEX, SQUARE_COORD
+
+# Bound stored with each score, an empty slot has no bound
+EMPTY, EXACT, LOWER_BOUND, UPPER_BOUND = range(4)
+
+# Each entry is an 8 byte key, 4 byte score, 2 byte move, 1 byte depth and 1 byte bound
+ENTRY_BYTES = 16
+NO_MOVE = 0xFFFF
+
+
+class TranspositionTable:
+    """
+    Represents a fixed-size transposition table keyed by Zobrist hash. Each bucket holds two entries, a
+    depth-preferred slot that only gives way to deeper (or same position) searches and an always-replace slot.
+    """
+
+    def __init__(self, size_mb=16):
+        self._bucket_count = max(1, int(size_mb * 1024 * 1024) // (ENTRY_BYTES * 2))
+        entry_count = self._bucket_count * 2
+        self._keys = array("Q", bytes(8 * entry_count))
+        self._scores = array("i", bytes(4 * entry_count))
+        self._moves = array("H", bytes(2 * entry_count))
+        self._depths = array("b", bytes(entry_count))
+        self._bounds = array("B", bytes(entry_count))
+        self._probe_count = 0
+        self._hit_count = 0
+        self._store_count = 0
+
+    def get_entry_count(self):
+        """Retrieve the number of entries the table can hold"""
+        return self._bucket_count * 2
+
+    def get_size_mb(self):
+        """Retrieve the memory used by the table entries in MB"""
+        return self._bucket_count * 2 * ENTRY_BYTES / (1024 * 1024)
+
+    def get_probe_count(self):
+        """Retrieve the number of probes since the table was created or cleared"""
+        return self._probe_count
+
+    def get_hit_count(self):
+        """Retrieve the number of probes that found their position"""
+        return self._hit_count
+
+    def get_store_count(self):
+        """Retrieve the number of stores since the table was created or cleared"""
+        return self._store_count
+
+    def get_hit_rate(self):
+        """Retrieve the fraction of probes that found their position"""
+        if self._probe_count == 0:
+            return 0.0
+        return self._hit_count / self._probe_count
+
+    def get_fill_rate(self):
+        """Retrieve the fraction of entries in use"""
+        entry_count = self._bucket_count * 2
+        return (entry_count - self._bounds.count(EMPTY)) / entry_count
+
+    def clear(self):
+        """Empty every entry and reset the counters"""
+        entry_count = self._bucket_count * 2
+        self._bounds = array("B", bytes(entry_count))
+        self._probe_count = 0
+        self._hit_count = 0
+        self._store_count = 0
+
+    def probe(self, key):
+        """Return the (depth, score, bound, move) stored for the key, or None if the position is not stored"""
+        self._probe_count += 1
+        index = (key % self._bucket_count) * 2
+        for slot in (index, index + 1):
+            if self._keys[slot] == key and self._bounds[slot] != EMPTY:
+                self._hit_count += 1
+                return self._depths[slot], self._scores[slot], self._bounds[slot], decode_move(self._moves[slot])
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """Store a search result, in the depth-preferred slot if it is at least as deep as what is there,
+        otherwise in the always-replace slot"""
+        self._store_count += 1
+        index = (key % self._bucket_count) * 2
+        if self._bounds[index] != EMPTY and self._keys[index] != key and self._depths[index] > depth:
+            index += 1
+
+        self._keys[index] = key
+        self._depths[index] = depth
+        self._scores[index] = score
+        self._bounds[index] = bound
+        self._moves[index] = encode_move(move)
+
+
+def encode_move(move):
+    """Pack a (starting square location, destination square location) pair into a 10-bit square index pair"""
+    if move is None:
+        return NO_MOVE
+    (start_row, start_col), (destination_row, destination_col) = move
+    return SQUARE_INDEX[start_row][start_col] << 5 | SQUARE_INDEX[destination_row][destination_col]
+
+
+def decode_move(code):
+    """Unpack a move packed by encode_move"""
+    if code == NO_MOVE:
+        return None
+    return SQUARE_COORD[code >> 5], SQUARE_COORD[code & 31]